@@ -9,10 +9,55 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     openai_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = Field(default=None, description="OpenAI-compatible API base URL (e.g. a local stub server)")
+    vision_model: str = "gpt-4-vision-preview"
+    vision_max_concurrency: int = Field(default=4, description="Maximum concurrent vision API calls per worker")
+    vision_requests_per_minute: float = 60
+    vision_tokens_per_minute: float = 60000
+    vision_max_retries: int = Field(default=4, description="Retries on 429, 5xx and timeouts")
+    vision_timeout: float = Field(default=60.0, description="Per-call timeout in seconds")
     google_maps_api_key: Optional[str] = None
+    google_places_base_url: str = Field(default="https://maps.googleapis.com/maps/api/place", description="Places API base URL (e.g. a local stand-in server)")
+    http_timeout: float = 10.0
+    http_max_connections: int = 100
+    vets_cache_ttl: float = Field(default=900, description="Seconds a nearby-vets result is served fresh")
+    vets_cache_stale_ttl: float = Field(default=3600, description="Extra seconds a result is served stale while refreshing in the background")
+    vets_cache_max_entries: int = 10000
+    vets_index_max_age: float = Field(default=604800, description="Seconds a fully fetched area is answered from the local clinic index")
+    vets_index_save_interval: float = Field(default=30, description="Seconds clinic index changes are batched before being written to disk")
+    vet_details_static_ttl: float = Field(default=2592000, description="Seconds before name, address, phone and website are refreshed")
+    vet_details_volatile_ttl: float = Field(default=3600, description="Seconds before rating and opening hours are refreshed")
+    vets_geohash_precision: int = Field(default=6, description="Geohash precision of nearby-vets cache cells (6 is about 1.2km x 0.6km)")
+    partitioned_collections: str = Field(default="videos:pet_id", description="Collections stored as one file per shard value, as collection:field pairs")
+    columnar_collections: str = Field(default="products,videos", description="Collections filtered, counted and range-queried through vectorized column arrays")
+    preload_collections: str = Field(default="", description="Collections loaded at startup from checksum-validated sidecar snapshots, e.g. pets,videos,products")
+    admin_token: Optional[str] = Field(default=None, description="Enables /api/admin backup and restore for requests sending it as X-Admin-Token")
+    backup_collections: str = "pets,videos,users,products"
     max_file_size: int = 104857600
+    admission_upload_concurrency: int = Field(default=4, description="Uploads and finalizes saved and decoded at once per worker")
+    admission_upload_queue: int = Field(default=16, description="Uploads waiting for a slot before new ones get 503")
+    admission_chunk_concurrency: int = 32
+    admission_chunk_queue: int = 64
+    admission_queue_timeout: float = Field(default=10.0, description="Seconds a request may wait for a slot before 503")
+    analysis_max_pending: int = Field(default=32, description="Queued or running background analyses before uploads get 503")
+    client_uploads_per_minute: float = Field(default=30, description="Per-client rate of upload, session and finalize requests")
+    client_upload_burst: float = 10
+    upload_session_ttl: float = Field(default=86400, description="Seconds a resumable upload session may stay idle before it is deleted")
     allowed_video_types: str = "video/mp4,video/avi,video/mov"
     allowed_image_types: str = "image/jpeg,image/png,image/jpg"
+    frame_max_edge: int = Field(default=768, description="Longest edge (px) of frames sent to the vision model")
+    frame_format: str = Field(default="jpeg", description="Frame encoding sent to the vision model: jpeg or webp")
+    frame_quality: int = Field(default=75, description="JPEG/WebP quality for encoded frames (1-100)")
+    frame_layout: str = Field(default="frames", description="frames: one image per frame, grid: all frames tiled into a single image")
+    frame_grid_columns: int = 3
+    motion_sample_fps: float = Field(default=4.0, description="Frames per second sampled for local activity analysis")
+    motion_max_samples: int = Field(default=240, description="Most frames sampled for local activity analysis; longer clips are sampled more sparsely")
+    motion_pixel_threshold: int = 20
+    still_motion_threshold: float = Field(default=0.005, description="Fraction of changed pixels below which a pet is considered still")
+    min_still_seconds: float = 2.0
+    frame_detail: str = Field(default="auto", description="Vision image detail level: low, high or auto")
+    slow_request_ms: float = Field(default=1000, description="Requests slower than this are logged with their phase breakdown")
+    profiler_enabled: bool = Field(default=False, description="Expose the sampling profiler at /debug/profile to requests sending admin_token as X-Admin-Token")
 
     class Config:
         env_file = ".env"
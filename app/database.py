@@ -1,5 +1,7 @@
+from app.config import settings
 from app.storage.json_repository import get_repository, JSONRepository
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +37,9 @@ class JSONCollection:
     async def find(self, query=None):
         return await self._repo.find(self._collection, query)
     
+    def iter_find(self, query=None):
+        return self._repo.iter_find(self._collection, query)
+    
     async def find_one(self, query):
         return await self._repo.find_one(self._collection, query)
     
@@ -44,6 +49,9 @@ class JSONCollection:
     async def delete_one(self, query):
         return await self._repo.delete_one(self._collection, query)
     
+    async def count_documents(self, query=None):
+        return await self._repo.count_documents(self._collection, query)
+    
     async def distinct(self, field: str):
         return await self._repo.distinct(self._collection, field)
 
@@ -58,17 +66,44 @@ async def get_database():
         _db_instance = JSONDatabase(repo)
     return _db_instance
 
+def _preload_collections():
+    return [name.strip() for name in settings.preload_collections.split(",") if name.strip()]
+
 async def connect_to_mongo():
-    """Initialize JSON file storage"""
+    """Initialize JSON file storage and warm configured collections"""
     try:
         repo = get_repository()
         logger.info("✅ JSON file storage initialized")
         print("✅ JSON file storage initialized")
+        
+        collections = _preload_collections()
+        if collections:
+            started = time.perf_counter()
+            sources = await repo.preload(collections)
+            # Derived indexes are built from the warm cache instead of on the first request
+            if "products" in collections:
+                from app.services.product_search import get_product_index
+                await get_product_index(repo, use_sidecar=True)
+            if "pets" in collections and "videos" in collections:
+                from app.services.pet_summary import get_pet_summary_view
+                await get_pet_summary_view(repo)
+            counts = {source: list(sources.values()).count(source) for source in set(sources.values())}
+            print(f"✅ Preloaded {', '.join(collections)} in {(time.perf_counter() - started) * 1000:.1f}ms {counts}")
     except Exception as e:
         logger.error(f"❌ Error initializing storage: {e}")
         print(f"❌ Error initializing storage: {e}")
 
 async def close_mongo_connection():
-    """Cleanup JSON storage (if needed)"""
+    """Persist snapshots of preloaded collections for the next warm start"""
+    collections = _preload_collections()
+    if collections:
+        try:
+            written = get_repository().save_snapshots(collections)
+            if "products" in collections:
+                from app.services.product_search import save_product_index
+                save_product_index(get_repository())
+            print(f"✅ Saved {written} snapshot(s)")
+        except Exception as e:
+            print(f"❌ Error saving snapshots: {e}")
     logger.info("✅ JSON storage cleanup complete")
     print("✅ JSON storage cleanup complete")
@@ -1,9 +1,18 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from app.config import settings
 from app.database import connect_to_mongo, close_mongo_connection
-from app.routes import pets, videos, shop, vets
+from app.routes import pets, videos, shop, vets, media, admin
+from app.services.admission import AdmissionMiddleware
+from app.services.vision_client import close_vision_client
+from app.services.http_client import close_http_client
+from app.services.profiler import sample_stacks
+from app.services.timing import server_timing_header, start_request
 import os
+import time
 
 app = FastAPI(
     title="PetCare API",
@@ -35,6 +44,10 @@ for domain in replit_domains:
     if domain.strip():
         allowed_origins.append(f"https://{domain.strip()}")
 
+# Rejects over-limit uploads before their bodies are read; added before CORS so
+# it runs inside it and 429/503 responses still carry CORS headers
+app.add_middleware(AdmissionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -42,27 +55,63 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
-# Static files
-os.makedirs("uploads/videos", exist_ok=True)
-os.makedirs("uploads/images", exist_ok=True)
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+class ServerTimingMiddleware:
+    """
+    Adds a Server-Timing header with the phases recorded by the repository
+    and services while handling the request, and logs slow requests.
+    Plain ASGI rather than BaseHTTPMiddleware so streamed and ranged
+    responses pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        phases = start_request()
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - started
+                header = server_timing_header(phases, total)
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode())]}
+                if total * 1000 >= settings.slow_request_ms:
+                    print(f"Slow request: {scope['method']} {scope['path']} took {total * 1000:.1f}ms ({header})")
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+app.add_middleware(ServerTimingMiddleware)
 
 # Events
 @app.on_event("startup")
 async def startup_event():
+    # Kept cheap for serverless cold starts: heavy modules load on first use
+    for folder in ("uploads/videos", "uploads/images", "uploads/thumbnails"):
+        os.makedirs(folder, exist_ok=True)
     await connect_to_mongo()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await vets.flush_vet_index()
     await close_mongo_connection()
+    await close_vision_client()
+    await close_http_client()
 
 # Routes
 app.include_router(pets.router, prefix="/api/pets", tags=["Pets"])
 app.include_router(videos.router, prefix="/api/videos", tags=["Videos"])
 app.include_router(shop.router, prefix="/api/shop", tags=["Shop"])
 app.include_router(vets.router, prefix="/api/vets", tags=["Vets"])
+app.include_router(media.router, prefix="/uploads", tags=["Media"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 @app.get("/")
 async def root():
@@ -75,3 +124,18 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/debug/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10, gt=0, le=120),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Sample all threads of this worker and return collapsed stacks for a flame graph"""
+    if not settings.profiler_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    # Stacks expose internals, so the profiler takes the same token as backup and restore
+    admin._require_admin(x_admin_token)
+    # Sampled from a worker thread so the event loop keeps serving (and shows up in the profile)
+    stacks = await run_in_threadpool(sample_stacks, seconds, interval_ms / 1000)
+    return PlainTextResponse(stacks)
@@ -14,6 +14,7 @@ class PetModel(BaseModel):
     color: Optional[str] = None
     description: Optional[str] = None
     image: Optional[str] = None
+    images: Optional[dict] = None  # rendition name -> {"webp", "jpeg", "width", "height"}
     health_score: int = 90
     videos_analyzed: int = 0
     appointments: int = 0
@@ -7,14 +7,21 @@ class VideoAnalysis(BaseModel):
     pet_id: str
     video_path: str
     thumbnail_path: Optional[str] = None
+    preview_path: Optional[str] = None
     duration: Optional[float] = None
+    fps: Optional[float] = None
+    frame_count: Optional[int] = None
+    resolution: Optional[str] = None
     file_size: int
     analysis_status: str = "pending"  # pending, processing, completed, failed
+    preliminary_analysis: Optional[Dict] = None  # local motion analysis, available once the upload is decoded
+    activity_level: Optional[str] = None
     insights: List[Dict] = []
     recommendations: List[str] = []
     confidence_score: Optional[float] = None
     detected_behaviors: List[str] = []
     health_concerns: List[str] = []
+    payload_bytes: Optional[int] = None  # bytes of encoded frames sent to the vision model
     created_at: datetime = Field(default_factory=datetime.utcnow)
     analyzed_at: Optional[datetime] = None
 
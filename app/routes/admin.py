@@ -0,0 +1,55 @@
+import hmac
+import time
+from fastapi import APIRouter, HTTPException, UploadFile, File, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.config import settings
+from app.storage.backup import iter_backup_archive, read_backup_archive
+from app.storage.json_repository import get_repository
+
+router = APIRouter()
+
+def _require_admin(token: Optional[str]):
+    # Disabled unless an admin token is configured
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not hmac.compare_digest(token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+def _backup_collections():
+    return [name.strip() for name in settings.backup_collections.split(",") if name.strip()]
+
+@router.get("/backup")
+async def backup(x_admin_token: Optional[str] = Header(None)):
+    """Stream a consistent tar.gz snapshot of all collections while the API keeps serving writes"""
+    _require_admin(x_admin_token)
+    try:
+        snapshot = await get_repository().snapshot(_backup_collections())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to snapshot data: {str(e)}")
+    filename = f"petcare-backup-{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}.tar.gz"
+    return StreamingResponse(
+        iter_backup_archive(snapshot),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/restore")
+async def restore(file: UploadFile = File(...), x_admin_token: Optional[str] = Header(None)):
+    """Replace the collections contained in a backup archive"""
+    _require_admin(x_admin_token)
+    try:
+        collections = await run_in_threadpool(read_backup_archive, file.file)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid backup archive: {str(e)}")
+    unknown = set(collections) - set(_backup_collections())
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collections in backup: {', '.join(sorted(unknown))}")
+    try:
+        await get_repository().restore(collections)
+        return {"restored": {name: len(documents) for name, documents in collections.items()}}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid backup archive: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to restore backup: {str(e)}")
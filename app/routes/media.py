@@ -0,0 +1,169 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+from app.services.storage import is_content_addressed, CHUNK_SIZE
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib
+import mimetypes
+import os
+
+router = APIRouter()
+
+UPLOAD_ROOT = os.path.realpath("uploads")
+
+# (path, mtime_ns, size) -> sha256 for files not named after their content, least recently used evicted first
+HASH_CACHE_MAX_ENTRIES = 4096
+_hash_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+async def _etag_for(path: str, stat: os.stat_result) -> str:
+    if is_content_addressed(path):
+        return f'"{os.path.splitext(os.path.basename(path))[0]}"'
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    digest = _hash_cache.get(key)
+    if digest is None:
+        digest = await run_in_threadpool(_hash_file, path)
+        _hash_cache[key] = digest
+        while len(_hash_cache) > HASH_CACHE_MAX_ENTRIES:
+            _hash_cache.popitem(last=False)
+    _hash_cache.move_to_end(key)
+    return f'"{digest}"'
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single `bytes=` range into an inclusive (start, end) pair.
+    Returns None when the header should be ignored; raises ValueError when unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        # Multipart ranges are not supported; serve the whole file instead
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        start = int(start_text) if start_text else None
+        end = int(end_text) if end_text else None
+    except ValueError:
+        # Malformed ranges are ignored
+        return None
+    if start is None:
+        if not end:
+            raise ValueError("Empty suffix range")
+        return max(0, size - end), size - 1
+    end = size - 1 if end is None else end
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+
+class FileRangeResponse(Response):
+    """
+    Streams a byte range of a file.
+    Uses the ASGI zero-copy send extension (sendfile) when the server offers it
+    and falls back to chunked reads in a worker thread otherwise.
+    """
+
+    def __init__(self, path: str, start: int, length: int, status_code: int, headers: Dict[str, str], send_body: bool = True):
+        super().__init__(status_code=status_code, headers=headers)
+        self.path = path
+        self.start = start
+        self.length = length
+        self.send_body = send_body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                # The extension takes a file object; the descriptor is still closed below
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": os.fdopen(fd, "rb", closefd=False),
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False
+                })
+                return
+
+            offset = self.start
+            remaining = self.length
+            while remaining > 0:
+                chunk = await run_in_threadpool(os.pread, fd, min(CHUNK_SIZE, remaining), offset)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # File shrank underneath us; terminate the body
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            os.close(fd)
+
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"])
+async def serve_media(file_path: str, request: Request):
+    """Serve uploaded media with Range, ETag and caching support"""
+    full_path = os.path.realpath(os.path.join(UPLOAD_ROOT, file_path))
+    if not full_path.startswith(UPLOAD_ROOT + os.sep):
+        raise HTTPException(status_code=404, detail="File not found")
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not os.path.isfile(full_path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    size = stat.st_size
+    etag = await _etag_for(full_path, stat)
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": (
+            "public, max-age=31536000, immutable"
+            if is_content_addressed(full_path)
+            else "public, no-cache"
+        )
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    headers["Content-Type"] = media_type
+    send_body = request.method != "HEAD"
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(length)
+            return FileRangeResponse(full_path, start, length, 206, headers, send_body)
+
+    headers["Content-Length"] = str(size)
+    return FileRangeResponse(full_path, 0, size, 200, headers, send_body)
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 from app.database import get_database
 from app.schemas.pet import PetCreate, PetUpdate, PetResponse
-from app.services.storage import save_image
+from app.services.response_cache import get_response_cache
+from app.services.ndjson import wants_ndjson, ndjson_response
+from app.services.pet_summary import get_pet_summary_view
+from app.storage.json_repository import get_repository
 import os
 
 router = APIRouter()
@@ -41,9 +45,12 @@ async def create_pet(pet: PetCreate, db=Depends(get_database)):
         raise HTTPException(status_code=500, detail=f"Failed to create pet: {error_msg}")
 
 @router.get("", response_model=List[dict])
-async def get_all_pets(db=Depends(get_database)):
-    """Get all pets"""
-    try:
+async def get_all_pets(request: Request, db=Depends(get_database)):
+    """Get all pets (streamed one per line with Accept: application/x-ndjson)"""
+    if wants_ndjson(request):
+        return ndjson_response(db.pets.iter_find())
+    
+    async def build():
         pets_data = await db.pets.find()
         pets = []
         for pet in pets_data:
@@ -51,11 +58,26 @@ async def get_all_pets(db=Depends(get_database)):
             pet["id"] = str(pet_id) if pet_id else None
             pets.append(pet)
         return pets
+    
+    try:
+        return await get_response_cache().respond(request, ["pets"], build)
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Failed to fetch pets: {str(e)}")
 
+@router.get("/summary")
+async def get_pet_summaries(request: Request):
+    """Dashboard summary for every pet: video count, latest status, recent concerns and health trend"""
+    async def build():
+        view = await get_pet_summary_view(get_repository())
+        return view.summaries()
+    
+    try:
+        return await get_response_cache().respond(request, ["pets", "videos"], build)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch pet summaries: {str(e)}")
+
 @router.get("/{pet_id}", response_model=dict)
 async def get_pet(pet_id: str, db=Depends(get_database)):
     """Get a specific pet by ID"""
@@ -134,16 +156,25 @@ async def upload_pet_image(
     if file.content_type not in ["image/jpeg", "image/png", "image/jpg"]:
         raise HTTPException(status_code=400, detail="Invalid file type")
     
-    # Save image
-    image_path = await save_image(file, "images")
+    # Imported on first use so cold starts don't load Pillow
+    from app.services.image_processor import create_renditions
+    
+    # Decode once and write resized WebP/JPEG renditions off the event loop
+    data = await file.read()
+    try:
+        renditions = await run_in_threadpool(create_renditions, data)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Image could not be processed")
+    image_path = renditions["card"]["jpeg"]
     
     # Update pet record
     await db.pets.update_one(
         {"_id": pet_id},
-        {"$set": {"image": image_path}}
+        {"$set": {"image": image_path, "images": renditions}}
     )
     
     return {
         "message": "Image uploaded successfully",
-        "image_path": image_path
+        "image_path": image_path,
+        "images": renditions
     }
@@ -1,23 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import List, Optional
 from app.database import get_database
+from app.storage.json_repository import get_repository
+from app.services.product_search import get_product_index
+from app.services.response_cache import get_response_cache
 
 router = APIRouter()
 
 @router.get("/products")
 async def get_products(
+    request: Request,
     category: Optional[str] = None,
     species: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
     db=Depends(get_database)
 ):
     """Get products with optional filters"""
-    try:
+    async def build():
         query = {}
         
         if category:
             query["category"] = category
         if species:
             query["suitable_for"] = species
+        price = {}
+        if min_price is not None:
+            price["$gte"] = min_price
+        if max_price is not None:
+            price["$lte"] = max_price
+        if price:
+            query["price"] = price
         
         products_data = await db.products.find(query if query else None)
         products = []
@@ -27,9 +40,44 @@ async def get_products(
             products.append(product)
         
         return products
+    
+    try:
+        return await get_response_cache().respond(request, ["products"], build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch products: {str(e)}")
 
+@router.get("/search")
+async def search_products(
+    q: str = "",
+    category: Optional[str] = None,
+    species: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Full-text product search with prefix matching and facet counts"""
+    try:
+        index = await get_product_index(get_repository())
+        result = index.search(
+            q,
+            category=category,
+            species=species,
+            min_price=min_price,
+            max_price=max_price,
+            limit=limit,
+            offset=offset
+        )
+        products = []
+        for product in result["results"]:
+            product_id_value = product.pop("_id", None)
+            product["id"] = str(product_id_value) if product_id_value else None
+            products.append(product)
+        result["results"] = products
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search products: {str(e)}")
+
 @router.get("/products/{product_id}")
 async def get_product(product_id: str, db=Depends(get_database)):
     """Get single product details"""
@@ -47,10 +95,13 @@ async def get_product(product_id: str, db=Depends(get_database)):
         raise HTTPException(status_code=500, detail=f"Failed to fetch product: {str(e)}")
 
 @router.get("/categories")
-async def get_categories(db=Depends(get_database)):
+async def get_categories(request: Request, db=Depends(get_database)):
     """Get all product categories"""
-    try:
+    async def build():
         categories = await db.products.distinct("category")
         return {"categories": categories}
+    
+    try:
+        return await get_response_cache().respond(request, ["products"], build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch categories: {str(e)}")
@@ -1,79 +1,177 @@
 from fastapi import APIRouter, HTTPException
-import httpx
 from app.config import settings
+from app.services.http_client import get_http_client
+from app.services.geo_cache import TTLCache, cell_query, haversine, radius_bucket
+from app.services.vet_details_cache import VetDetailsCache
 
 router = APIRouter()
 
+# Nearby results keyed by (geohash cell, radius bucket)
+nearby_cache = TTLCache(
+    ttl=settings.vets_cache_ttl,
+    stale_ttl=settings.vets_cache_stale_ttl,
+    max_entries=settings.vets_cache_max_entries
+)
+
+# Place details persisted on disk, static and volatile fields refreshed separately
+details_cache = VetDetailsCache(
+    "data/cache/vet_details",
+    static_ttl=settings.vet_details_static_ttl,
+    volatile_ttl=settings.vet_details_volatile_ttl
+)
+
+_vet_index = None
+
+def _get_vet_index():
+    # Imported on first use so cold starts don't load NumPy
+    global _vet_index
+    if _vet_index is None:
+        from app.services.vet_index import get_vet_index
+        _vet_index = get_vet_index()
+    return _vet_index
+
+async def flush_vet_index():
+    """Write clinic index changes still waiting for their batched save"""
+    if _vet_index is not None:
+        await _vet_index.save()
+
+async def _fetch_nearby(lat: float, lng: float, radius: int) -> list:
+    """Query the Places API and transform results"""
+    url = f"{settings.google_places_base_url}/nearbysearch/json"
+
+    params = {
+        "location": f"{lat},{lng}",
+        "radius": radius,
+        "type": "veterinary_care",
+        "key": settings.google_maps_api_key
+    }
+
+    response = await get_http_client().get(url, params=params)
+
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=response.status_code,
+            detail="Failed to fetch veterinarians"
+        )
+
+    data = response.json()
+    status = data.get("status")
+    # Errors and quota denials arrive as 200; don't cache them or mark the area covered
+    if status not in ("OK", "ZERO_RESULTS"):
+        raise HTTPException(
+            status_code=502,
+            detail=f"Failed to fetch veterinarians: {status or 'unknown status'}"
+        )
+    complete = "next_page_token" not in data
+
+    # Transform results
+    vets = []
+    for place in data.get("results", []):
+        vet = {
+            "id": place.get("place_id"),
+            "name": place.get("name"),
+            "address": place.get("vicinity"),
+            "rating": place.get("rating"),
+            "location": place.get("geometry", {}).get("location"),
+            "open_now": place.get("opening_hours", {}).get("open_now", False)
+        }
+        vets.append(vet)
+
+    # Remember every clinic; a circle whose results weren't truncated is fully covered
+    index = _get_vet_index()
+    index.add_clinics(vets)
+    if complete:
+        index.add_coverage(lat, lng, radius, settings.vets_index_max_age)
+    index.schedule_save()
+
+    return vets
+
+async def _fetch_details(place_id: str, fields: list):
+    """Fetch the given detail fields for a place from the Places API"""
+    url = f"{settings.google_places_base_url}/details/json"
+
+    params = {
+        "place_id": place_id,
+        "fields": ",".join(fields),
+        "key": settings.google_maps_api_key
+    }
+
+    response = await get_http_client().get(url, params=params)
+
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=response.status_code,
+            detail="Failed to fetch vet details"
+        )
+
+    data = response.json()
+    if data.get("status") != "OK":
+        return None
+    result = data.get("result") or {}
+
+    location = result.get("geometry", {}).get("location")
+    if location:
+        index = _get_vet_index()
+        index.add_clinics([{
+            "id": place_id,
+            "name": result.get("name"),
+            "address": result.get("formatted_address"),
+            "rating": result.get("rating"),
+            "location": location
+        }])
+        index.schedule_save()
+
+    return result
+
 @router.get("/nearby")
 async def find_nearby_vets(lat: float, lng: float, radius: int = 5000):
     """Find nearby veterinarians using Google Places API"""
-    
+
     if not settings.google_maps_api_key:
         raise HTTPException(
             status_code=500,
             detail="Google Maps API key not configured"
         )
-    
-    url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    
-    params = {
-        "location": f"{lat},{lng}",
-        "radius": radius,
-        "type": "veterinary_care",
-        "key": settings.google_maps_api_key
-    }
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail="Failed to fetch veterinarians"
-            )
-        
-        data = response.json()
-        
-        # Transform results
-        vets = []
-        for place in data.get("results", []):
-            vet = {
-                "id": place.get("place_id"),
-                "name": place.get("name"),
-                "address": place.get("vicinity"),
-                "rating": place.get("rating"),
-                "location": place.get("geometry", {}).get("location"),
-                "open_now": place.get("opening_hours", {}).get("open_now", False)
-            }
-            vets.append(vet)
-        
-        return {"vets": vets}
+
+    # Areas already fully fetched are answered from the local index
+    index = _get_vet_index()
+    if index.covers(lat, lng, radius, settings.vets_index_max_age):
+        return {"vets": index.query(lat, lng, radius)}
+
+    # Searches from anywhere in a geohash cell share one cached upstream query
+    cell, center_lat, center_lng, upstream_radius = cell_query(
+        lat, lng, radius, settings.vets_geohash_precision
+    )
+    cell_vets = await nearby_cache.get_or_fetch(
+        (cell, radius_bucket(radius)),
+        lambda: _fetch_nearby(center_lat, center_lng, upstream_radius)
+    )
+
+    # Narrow the cell's results to the caller's exact position and radius
+    vets = []
+    for vet in cell_vets:
+        location = vet.get("location") or {}
+        if "lat" not in location or "lng" not in location:
+            continue
+        distance = haversine(lat, lng, location["lat"], location["lng"])
+        if distance <= radius:
+            vets.append({**vet, "distance": round(distance)})
+    vets.sort(key=lambda vet: vet["distance"])
+
+    return {"vets": vets}
 
 @router.get("/{place_id}/details")
 async def get_vet_details(place_id: str):
     """Get detailed information about a specific vet"""
-    
+
     if not settings.google_maps_api_key:
         raise HTTPException(
             status_code=500,
             detail="Google Maps API key not configured"
         )
-    
-    url = "https://maps.googleapis.com/maps/api/place/details/json"
-    
-    params = {
-        "place_id": place_id,
-        "fields": "name,formatted_address,formatted_phone_number,rating,opening_hours,website,photos",
-        "key": settings.google_maps_api_key
-    }
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail="Failed to fetch vet details"
-            )
-        
-        return response.json()
+
+    result = await details_cache.get(place_id, lambda fields: _fetch_details(place_id, fields))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Vet not found")
+
+    return {"result": result, "status": "OK"}
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks, Depends, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from datetime import datetime
+from app.config import settings
 from app.database import get_database
-from app.schemas.video import VideoAnalysisResponse, VideoUploadResponse
-from app.services.video_processor import process_video
-from app.services.ai_analysis import analyze_video
+from app.schemas.video import VideoAnalysisResponse, VideoUploadResponse, UploadSessionCreate, UploadSessionResponse
 from app.services.storage import save_video
+from app.services.admission import get_analysis_backlog, get_limiter
+from app.services.upload_sessions import UploadSessionError, contiguous_offset, get_upload_sessions
+from app.services.response_cache import get_response_cache
+from app.services.ndjson import wants_ndjson, ndjson_response
 import os
 
 router = APIRouter()
@@ -27,64 +32,193 @@ async def upload_video(
         if file.content_type not in ["video/mp4", "video/avi", "video/mov"]:
             raise HTTPException(status_code=400, detail="Invalid video format")
         
-        # Save video
-        video_path = await save_video(file)
-        
-        # Create video record
-        video_record = {
-            "pet_id": pet_id,
-            "video_path": video_path,
-            "file_size": file.size,
-            "analysis_status": "pending",
-            "insights": [],
-            "recommendations": []
-        }
-        
-        result = await db.videos.insert_one(video_record)
-        video_id = str(result["inserted_id"])
-        
-        # Add background task for video analysis
-        if background_tasks:
-            background_tasks.add_task(
-                analyze_video_background,
-                video_id,
-                video_path,
-                pet_id,
-                db
-            )
-        
-        return {
-            "video_id": video_id,
-            "message": "Video uploaded successfully. Analysis in progress.",
-            "status": "processing"
-        }
+        async with get_limiter("upload").slot():
+            # Save video
+            video_path = await save_video(file)
+            return await _ingest_video(video_path, pet_id, file.size, background_tasks, db)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload video: {str(e)}")
 
-async def analyze_video_background(video_id: str, video_path: str, pet_id: str, db):
-    """Background task to analyze video"""
+async def _ingest_video(
+    video_path: str,
+    pet_id: str,
+    file_size: Optional[int],
+    background_tasks: Optional[BackgroundTasks],
+    db
+) -> dict:
+    """Record a stored upload and queue decoding and analysis, so the request returns without decoding"""
+    video_record = {
+        "pet_id": pet_id,
+        "video_path": video_path,
+        "file_size": file_size,
+        "analysis_status": "pending",
+        "insights": [],
+        "recommendations": []
+    }
+    
+    result = await db.videos.insert_one(video_record)
+    video_id = str(result["inserted_id"])
+    
+    # Add background task for video analysis
+    if background_tasks:
+        background_tasks.add_task(
+            analyze_video_background,
+            video_id,
+            video_path,
+            pet_id,
+            db,
+            get_analysis_backlog().add()
+        )
+    
+    return {
+        "video_id": video_id,
+        "message": "Video uploaded successfully. Analysis in progress.",
+        "status": "processing"
+    }
+
+@router.post("/uploads/{pet_id}", status_code=201, response_model=UploadSessionResponse)
+async def create_upload_session(
+    pet_id: str,
+    upload: UploadSessionCreate,
+    db=Depends(get_database)
+):
+    """Start a resumable upload; send the bytes with PATCH /uploads/{upload_id}"""
+    try:
+        pet = await db.pets.find_one({"_id": pet_id})
+        if not pet:
+            raise HTTPException(status_code=404, detail="Pet not found")
+        if upload.content_type not in settings.allowed_video_types.split(","):
+            raise HTTPException(status_code=400, detail="Invalid video format")
+        if upload.size <= 0 or upload.size > settings.max_file_size:
+            raise HTTPException(status_code=413, detail="Invalid upload size")
+        
+        session = await run_in_threadpool(
+            get_upload_sessions().create, pet_id, upload.filename, upload.content_type, upload.size
+        )
+        return _session_response(session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create upload: {str(e)}")
+
+def _session_response(session: dict) -> dict:
+    return {
+        "upload_id": session["id"],
+        "offset": contiguous_offset(session),
+        "size": session["size"],
+        "received": session["received"],
+        "expires_at": datetime.utcfromtimestamp(session["updated_at"] + get_upload_sessions().ttl)
+    }
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload_session(upload_id: str):
+    """Where to resume: the contiguous offset and every received byte range"""
+    session = get_upload_sessions().get(upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return _session_response(session)
+
+@router.patch("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def upload_chunk(upload_id: str, request: Request, upload_offset: int = Header(...)):
+    """Write the request body at Upload-Offset; chunks may be sent out of order or in parallel"""
     try:
-        # Update status to processing
+        async with get_limiter("chunk").slot():
+            session = await get_upload_sessions().write_chunk(upload_id, upload_offset, request.stream())
+        return _session_response(session)
+    except HTTPException:
+        raise
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to write chunk: {str(e)}")
+
+@router.post("/uploads/{upload_id}/finalize")
+async def finalize_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    db=Depends(get_database)
+):
+    """Complete a resumable upload and start analysis, as a single-request upload does"""
+    try:
+        async with get_limiter("upload").slot():
+            session = await get_upload_sessions().finalize(upload_id, "uploads/videos")
+            return await _ingest_video(session["file_path"], session["pet_id"], session["size"], background_tasks, db)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to finalize upload: {str(e)}")
+
+@router.delete("/uploads/{upload_id}")
+async def abort_upload(upload_id: str):
+    """Discard a resumable upload"""
+    if not await run_in_threadpool(get_upload_sessions().abort, upload_id):
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return {"message": "Upload aborted"}
+
+async def analyze_video_background(
+    video_id: str,
+    video_path: str,
+    pet_id: str,
+    db,
+    backlog_started: Optional[float] = None
+):
+    """Background task to decode and analyze video"""
+    try:
+        # Imported on first use so cold starts don't load OpenCV/NumPy
+        from app.services.video_processor import process_video
+        from app.services.activity_analysis import analyze_activity
+        
+        # Decode once: metadata, thumbnail, preview strip and analysis frames
+        try:
+            ingest = await run_in_threadpool(process_video, video_path)
+        except ValueError as e:
+            await db.videos.update_one(
+                {"_id": video_id},
+                {"$set": {"analysis_status": "failed", "error": "Video could not be decoded"}}
+            )
+            print(f"Error decoding video {video_id}: {str(e)}")
+            return
+        frames = ingest.pop("frames")
+        
+        # Local activity analysis, readable on GET /{video_id} while the remote one runs
+        preliminary = await run_in_threadpool(
+            analyze_activity,
+            ingest.pop("motion_frames"),
+            ingest.pop("motion_times")
+        )
         await db.videos.update_one(
             {"_id": video_id},
-            {"$set": {"analysis_status": "processing"}}
+            {"$set": {
+                **ingest,
+                "preliminary_analysis": preliminary,
+                "activity_level": preliminary["activity_level"],
+                "analysis_status": "processing"
+            }}
         )
         
-        # Analyze video using AI
-        analysis_result = await analyze_video(video_path)
+        # Analyze video using AI (imported on first use: pulls in OpenAI)
+        from app.services.ai_analysis import analyze_video
+        analysis_result = await analyze_video(video_path, frames)
+        
+        # Enrich with the local activity analysis
+        concerns = analysis_result.get("concerns", [])
+        concerns += [c for c in preliminary.get("concerns", []) if c not in concerns]
         
         # Update video record with analysis
         await db.videos.update_one(
             {"_id": video_id},
             {"$set": {
                 "analysis_status": "completed",
-                "insights": analysis_result["insights"],
+                "insights": preliminary.get("insights", []) + analysis_result["insights"],
                 "recommendations": analysis_result["recommendations"],
                 "confidence_score": analysis_result["confidence"],
                 "detected_behaviors": analysis_result.get("behaviors", []),
-                "health_concerns": analysis_result.get("concerns", [])
+                "health_concerns": concerns,
+                "payload_bytes": analysis_result.get("payload_bytes")
             }}
         )
         
@@ -104,6 +238,9 @@ async def analyze_video_background(video_id: str, video_path: str, pet_id: str,
             {"$set": {"analysis_status": "failed"}}
         )
         print(f"Error analyzing video: {str(e)}")
+    finally:
+        if backlog_started is not None:
+            get_analysis_backlog().done(backlog_started)
 
 @router.get("/{video_id}")
 async def get_video_analysis(video_id: str, db=Depends(get_database)):
@@ -122,9 +259,12 @@ async def get_video_analysis(video_id: str, db=Depends(get_database)):
         raise HTTPException(status_code=500, detail=f"Failed to fetch video: {str(e)}")
 
 @router.get("/pet/{pet_id}/videos")
-async def get_pet_videos(pet_id: str, db=Depends(get_database)):
-    """Get all videos for a specific pet"""
-    try:
+async def get_pet_videos(pet_id: str, request: Request, db=Depends(get_database)):
+    """Get all videos for a specific pet (streamed one per line with Accept: application/x-ndjson)"""
+    if wants_ndjson(request):
+        return ndjson_response(db.videos.iter_find({"pet_id": pet_id}))
+    
+    async def build():
         videos_data = await db.videos.find({"pet_id": pet_id})
         videos = []
         for video in videos_data:
@@ -133,5 +273,8 @@ async def get_pet_videos(pet_id: str, db=Depends(get_database)):
             videos.append(video)
         
         return videos
+    
+    try:
+        return await get_response_cache().respond(request, ["videos"], build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch videos: {str(e)}")
@@ -29,6 +29,7 @@ class PetResponse(BaseModel):
     gender: str
     health_score: int
     image: Optional[str]
+    images: Optional[dict] = None
     
     class Config:
         from_attributes = True
@@ -16,3 +16,15 @@ class VideoUploadResponse(BaseModel):
     video_id: str
     message: str
     status: str
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    offset: int
+    size: int
+    received: List[List[int]]
+    expires_at: datetime
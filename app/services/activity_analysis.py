@@ -0,0 +1,80 @@
+import numpy as np
+from app.config import settings
+from typing import Dict, List, Optional
+
+def analyze_activity(
+    frames: List,
+    times: List[float],
+    pixel_threshold: Optional[int] = None,
+    still_threshold: Optional[float] = None,
+    min_still_seconds: Optional[float] = None
+) -> Dict:
+    """
+    Fast local activity analysis by frame differencing.
+    Expects small grayscale frames sampled at a fixed rate (see process_video)
+    and returns an activity level, a motion timeline and still periods.
+    """
+    pixel_threshold = settings.motion_pixel_threshold if pixel_threshold is None else pixel_threshold
+    still_threshold = settings.still_motion_threshold if still_threshold is None else still_threshold
+    min_still_seconds = settings.min_still_seconds if min_still_seconds is None else min_still_seconds
+
+    if len(frames) < 2:
+        return {
+            "activity_level": "unknown",
+            "motion_score": 0.0,
+            "still_ratio": 0.0,
+            "timeline": [],
+            "still_periods": [],
+            "insights": [],
+            "concerns": []
+        }
+
+    stack = np.stack(frames).astype(np.int16)
+    # Fraction of pixels that changed noticeably between consecutive samples
+    changed = np.abs(np.diff(stack, axis=0)) > pixel_threshold
+    motion = changed.reshape(changed.shape[0], -1).mean(axis=1)
+    interval_times = np.asarray(times[1:])
+
+    still = motion < still_threshold
+    still_periods = []
+    start = None
+    for i, is_still in enumerate(np.append(still, False)):
+        if is_still and start is None:
+            start = i
+        elif not is_still and start is not None:
+            begin, end = float(times[start]), float(times[i])
+            if end - begin >= min_still_seconds:
+                still_periods.append({"start": round(begin, 2), "end": round(end, 2)})
+            start = None
+
+    duration = float(times[-1] - times[0]) or 1.0
+    still_ratio = sum(p["end"] - p["start"] for p in still_periods) / duration
+    motion_score = float(motion.mean())
+
+    if motion_score < 0.01:
+        activity_level = "low"
+    elif motion_score < 0.05:
+        activity_level = "moderate"
+    else:
+        activity_level = "high"
+
+    insights = [{"type": "info", "text": f"Local motion analysis: {activity_level} activity level"}]
+    concerns = []
+    if still_ratio > 0.8:
+        insights.append({"type": "warning", "text": "Pet was still for most of the video"})
+        concerns.append("Possible lethargy: very little movement detected")
+    elif still_periods:
+        insights.append({"type": "info", "text": f"{len(still_periods)} resting period(s) detected"})
+
+    return {
+        "activity_level": activity_level,
+        "motion_score": round(motion_score, 4),
+        "still_ratio": round(still_ratio, 3),
+        "timeline": [
+            {"t": round(float(t), 2), "motion": round(float(m), 4)}
+            for t, m in zip(interval_times, motion)
+        ],
+        "still_periods": still_periods,
+        "insights": insights,
+        "concerns": concerns
+    }
@@ -0,0 +1,187 @@
+import asyncio
+import math
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.services.vision_client import TokenBucket
+from typing import Dict, Optional, Tuple
+
+def _rejected(status_code: int, detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+class AdmissionLimiter:
+    """
+    Concurrency limit with a bounded wait queue. Requests beyond the queue,
+    or still queued after queue_timeout, are rejected with 503 and a
+    Retry-After derived from the recent average time a slot is held.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+        self._average_seconds = 1.0
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0}
+
+    def retry_after(self) -> float:
+        return self._average_seconds * (self._waiting + 1) / self.max_concurrent
+
+    def check_queue(self):
+        """Raise 503 if a request arriving now would find every slot taken and the queue full"""
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise _rejected(503, f"Too many concurrent {self.name} requests", self.retry_after())
+
+    async def _acquire(self):
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return
+        self.check_queue()
+        self._waiting += 1
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise _rejected(503, f"Timed out waiting for a {self.name} slot", self.retry_after())
+        finally:
+            self._waiting -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self._acquire()
+        self.stats["admitted"] += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+            # Exponentially weighted, so Retry-After follows the current load
+            self._average_seconds = 0.8 * self._average_seconds + 0.2 * (time.monotonic() - started)
+
+
+class BacklogLimit:
+    """Bounds work accepted now but finished later, such as queued background analyses"""
+
+    def __init__(self, name: str, max_pending: int, workers: int):
+        self.name = name
+        self.max_pending = max_pending
+        self.workers = max(1, workers)
+        self.pending = 0
+        self._average_seconds = 10.0
+
+    def check(self):
+        if self.pending >= self.max_pending:
+            retry_after = self._average_seconds * (self.pending - self.max_pending + 1) / self.workers
+            raise _rejected(503, f"Too many pending {self.name} jobs", retry_after)
+
+    def add(self) -> float:
+        self.pending += 1
+        return time.monotonic()
+
+    def done(self, started: float):
+        self.pending -= 1
+        self._average_seconds = 0.8 * self._average_seconds + 0.2 * (time.monotonic() - started)
+
+
+class ClientRateLimiter:
+    """Per-client token buckets (keyed by client address), least recently seen evicted first"""
+
+    def __init__(self, requests_per_minute: float, burst: float, max_clients: int = 10000):
+        self.rate = requests_per_minute / 60
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def check(self, client: Optional[str]):
+        """Take a token for the client or raise 429 with Retry-After"""
+        key = client or "unknown"
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(key)
+        wait = bucket.try_acquire()
+        if wait > 0:
+            raise _rejected(429, "Too many requests", wait)
+
+
+_limiters: Dict[str, AdmissionLimiter] = {}
+_analysis_backlog: Optional[BacklogLimit] = None
+_client_limiter: Optional[ClientRateLimiter] = None
+
+def get_limiter(name: str) -> AdmissionLimiter:
+    """Shared limiter per route group: upload (save and decode) or chunk (resumable chunk writes)"""
+    if name not in _limiters:
+        limits = {
+            "upload": (settings.admission_upload_concurrency, settings.admission_upload_queue),
+            "chunk": (settings.admission_chunk_concurrency, settings.admission_chunk_queue)
+        }
+        max_concurrent, max_queue = limits[name]
+        _limiters[name] = AdmissionLimiter(name, max_concurrent, max_queue, settings.admission_queue_timeout)
+    return _limiters[name]
+
+def get_analysis_backlog() -> BacklogLimit:
+    global _analysis_backlog
+    if _analysis_backlog is None:
+        _analysis_backlog = BacklogLimit("analysis", settings.analysis_max_pending, settings.vision_max_concurrency)
+    return _analysis_backlog
+
+def get_client_limiter() -> ClientRateLimiter:
+    global _client_limiter
+    if _client_limiter is None:
+        _client_limiter = ClientRateLimiter(settings.client_uploads_per_minute, settings.client_upload_burst)
+    return _client_limiter
+
+
+# POST routes whose cost is known from the path alone:
+# (pattern, limiter whose queue must have room, also bounded by the analysis backlog)
+_ADMITTED_ROUTES: Tuple[Tuple["re.Pattern", Optional[str], bool], ...] = (
+    (re.compile(r"^/api/videos/upload/[^/]+$"), "upload", True),
+    (re.compile(r"^/api/videos/uploads/[^/]+$"), None, False),
+    (re.compile(r"^/api/videos/uploads/[^/]+/finalize$"), "upload", True)
+)
+
+class AdmissionMiddleware:
+    """
+    Applies the per-client rate limit, the upload queue check and the
+    analysis backlog check to upload, session and finalize requests before
+    the app sees them, so a rejected upload is answered without reading (or
+    spooling) its body.
+    Plain ASGI for the same reason ServerTimingMiddleware is.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST":
+            for pattern, limiter, backlog in _ADMITTED_ROUTES:
+                if not pattern.match(scope["path"]):
+                    continue
+                client = scope.get("client")
+                try:
+                    get_client_limiter().check(client[0] if client else None)
+                    if limiter is not None:
+                        get_limiter(limiter).check_queue()
+                    if backlog:
+                        get_analysis_backlog().check()
+                except HTTPException as e:
+                    response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+                    await response(scope, receive, send)
+                    return
+                break
+        await self.app(scope, receive, send)
@@ -1,22 +1,20 @@
 import cv2
-import base64
-from openai import AsyncOpenAI
+import time
+from fastapi.concurrency import run_in_threadpool
 from app.config import settings
+from app.services.frame_encoder import encode_frames
+from app.services.vision_client import get_vision_client
 from typing import Dict, List, Optional
 import os
 
-# Only initialize client if API key is provided
-client: Optional[AsyncOpenAI] = None
-if settings.openai_api_key:
-    client = AsyncOpenAI(api_key=settings.openai_api_key)
-
-async def analyze_video(video_path: str) -> Dict:
+async def analyze_video(video_path: str, frames: Optional[List] = None) -> Dict:
     """
     Analyze pet video using OpenAI Vision API
-    Extracts frames and sends them for AI analysis
+    Uses frames captured at ingest, or extracts them, and sends them for AI analysis
     """
     
-    # Check if OpenAI client is available
+    # Check if OpenAI client is available (only configured if API key is provided)
+    client = get_vision_client()
     if not client:
         return {
             "insights": [{"type": "warning", "text": "OpenAI API key not configured. Using basic analysis."}],
@@ -26,15 +24,16 @@ async def analyze_video(video_path: str) -> Dict:
             "confidence": 0.0
         }
     
-    # Extract frames from video
-    frames = extract_frames(video_path, num_frames=5)
+    # Extract frames from video unless ingest already captured them
+    if frames is None:
+        frames = await run_in_threadpool(extract_frames, video_path, 5)
     
-    # Encode frames to base64
-    base64_frames = []
-    for frame in frames:
-        _, buffer = cv2.imencode('.jpg', frame)
-        base64_frame = base64.b64encode(buffer).decode('utf-8')
-        base64_frames.append(base64_frame)
+    # Downscale, compress and base64-encode frames
+    encoded = encode_frames(frames)
+    print(
+        f"Vision payload: {encoded['image_count']} image(s), "
+        f"{encoded['payload_bytes']} bytes (from {encoded['source_bytes']} raw frame bytes)"
+    )
     
     # Create prompt for AI
     prompt = """
@@ -49,8 +48,9 @@ async def analyze_video(video_path: str) -> Dict:
     
     try:
         # Call OpenAI API
-        response = await client.chat.completions.create(
-            model="gpt-4-vision-preview",
+        started = time.perf_counter()
+        response = await client.chat(
+            model=settings.vision_model,
             messages=[
                 {
                     "role": "user",
@@ -60,15 +60,18 @@ async def analyze_video(video_path: str) -> Dict:
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/jpeg;base64,{frame}"
+                                    "url": url,
+                                    "detail": settings.frame_detail
                                 }
-                            } for frame in base64_frames
+                            } for url in encoded["urls"]
                         ]
                     ]
                 }
             ],
             max_tokens=1000
         )
+        elapsed = time.perf_counter() - started
+        print(f"Vision call completed in {elapsed:.2f}s")
         
         # Parse response
         result = response.choices[0].message.content
@@ -86,7 +89,8 @@ async def analyze_video(video_path: str) -> Dict:
                 "Maintain current diet",
                 "Schedule regular vet checkups"
             ],
-            "confidence": 0.85
+            "confidence": 0.85,
+            "payload_bytes": encoded["payload_bytes"]
         }
         
         return analysis_result
@@ -98,7 +102,8 @@ async def analyze_video(video_path: str) -> Dict:
             "behaviors": [],
             "concerns": ["Unable to complete analysis"],
             "recommendations": ["Please try uploading the video again"],
-            "confidence": 0.0
+            "confidence": 0.0,
+            "payload_bytes": encoded["payload_bytes"]
         }
 
 def extract_frames(video_path: str, num_frames: int = 5) -> List:
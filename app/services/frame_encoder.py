@@ -0,0 +1,82 @@
+import cv2
+import base64
+import math
+import numpy as np
+from app.config import settings
+from typing import Dict, List, Optional
+
+_MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+def resize_frame(frame, max_edge: int):
+    """Downscale a frame so its longest edge is at most max_edge"""
+    height, width = frame.shape[:2]
+    long_edge = max(height, width)
+    if max_edge <= 0 or long_edge <= max_edge:
+        return frame
+    scale = max_edge / long_edge
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+def build_grid(frames: List, columns: int):
+    """Tile equally sized frames into a single grid image"""
+    columns = max(1, min(columns, len(frames)))
+    rows = math.ceil(len(frames) / columns)
+    cell_h, cell_w = frames[0].shape[:2]
+    grid = np.zeros((rows * cell_h, columns * cell_w, 3), dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        if frame.shape[:2] != (cell_h, cell_w):
+            frame = cv2.resize(frame, (cell_w, cell_h), interpolation=cv2.INTER_AREA)
+        row, col = divmod(i, columns)
+        grid[row * cell_h:(row + 1) * cell_h, col * cell_w:(col + 1) * cell_w] = frame
+    return grid
+
+def _encode(image, fmt: str, quality: int) -> bytes:
+    if fmt == "webp":
+        ok, buffer = cv2.imencode(".webp", image, [cv2.IMWRITE_WEBP_QUALITY, quality])
+    else:
+        ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+    if not ok:
+        raise ValueError(f"Failed to encode frame as {fmt}")
+    return buffer.tobytes()
+
+def encode_frames(
+    frames: List,
+    max_edge: Optional[int] = None,
+    fmt: Optional[str] = None,
+    quality: Optional[int] = None,
+    layout: Optional[str] = None,
+    grid_columns: Optional[int] = None
+) -> Dict:
+    """
+    Encode frames into base64 data URLs for the vision model.
+    Frames are downscaled, compressed and optionally tiled into one grid image.
+    Returns the data URLs together with the number of bytes sent.
+    """
+    max_edge = settings.frame_max_edge if max_edge is None else max_edge
+    fmt = (fmt or settings.frame_format).lower()
+    quality = settings.frame_quality if quality is None else quality
+    layout = (layout or settings.frame_layout).lower()
+    grid_columns = grid_columns or settings.frame_grid_columns
+
+    if fmt not in _MIME_TYPES:
+        raise ValueError(f"Unsupported frame format: {fmt}")
+
+    resized = [resize_frame(frame, max_edge) for frame in frames]
+    if layout == "grid" and len(resized) > 1:
+        images = [build_grid(resized, grid_columns)]
+    else:
+        images = resized
+
+    urls = []
+    payload_bytes = 0
+    for image in images:
+        encoded = base64.b64encode(_encode(image, fmt, quality)).decode("utf-8")
+        payload_bytes += len(encoded)
+        urls.append(f"data:{_MIME_TYPES[fmt]};base64,{encoded}")
+
+    return {
+        "urls": urls,
+        "payload_bytes": payload_bytes,
+        "source_bytes": sum(frame.nbytes for frame in frames),
+        "image_count": len(urls)
+    }
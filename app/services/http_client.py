@@ -0,0 +1,30 @@
+from app.config import settings
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+
+_http_client: Optional["httpx.AsyncClient"] = None
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Shared pooled HTTP client for outbound API calls"""
+    global _http_client
+    if _http_client is None:
+        # Imported on first use to keep cold starts cheap
+        import httpx
+
+        _http_client = httpx.AsyncClient(
+            timeout=settings.http_timeout,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_connections
+            )
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the shared HTTP client's connection pool"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,43 @@
+import io
+from PIL import Image, ImageOps
+from app.services.storage import write_content_addressed
+from typing import Dict
+
+# Rendition name -> longest edge in pixels
+RENDITIONS = {
+    "thumb": 160,
+    "card": 480,
+    "full": 1600
+}
+
+IMAGE_DIR = "uploads/images"
+
+def _encode(image: Image.Image, fmt: str, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    if fmt == "WEBP":
+        image.save(buffer, "WEBP", quality=quality, method=4)
+    else:
+        image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+def create_renditions(data: bytes, folder: str = IMAGE_DIR, quality: int = 80) -> Dict:
+    """
+    Decode an uploaded image once, apply its EXIF orientation and write
+    resized WebP and JPEG renditions. Blocking; run it in a worker thread.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        # Flatten transparency and palettes for JPEG
+        image = image.convert("RGB")
+
+    renditions = {}
+    # Largest first so each step downsamples an already-reduced image
+    for name, edge in sorted(RENDITIONS.items(), key=lambda item: -item[1]):
+        image.thumbnail((edge, edge), Image.LANCZOS)
+        renditions[name] = {
+            "width": image.width,
+            "height": image.height,
+            "webp": write_content_addressed(_encode(image, "WEBP", quality), folder, ".webp"),
+            "jpeg": write_content_addressed(_encode(image, "JPEG", quality), folder, ".jpg")
+        }
+    return renditions
@@ -0,0 +1,38 @@
+import json
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Flush once this many bytes are buffered so small documents share a send
+_FLUSH_BYTES = 64 * 1024
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def encode_line(document: Dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(document, default=str, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(document, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+
+async def _render(documents: AsyncIterator[Dict]) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    async for document in documents:
+        document_id = document.pop("_id", None)
+        document["id"] = str(document_id) if document_id else None
+        buffer += encode_line(document)
+        if len(buffer) >= _FLUSH_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+def ndjson_response(documents: AsyncIterator[Dict]) -> StreamingResponse:
+    """Stream repository documents as newline-delimited JSON with `_id` renamed to `id`"""
+    return StreamingResponse(_render(documents), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,137 @@
+import asyncio
+from app.storage.json_repository import JSONRepository
+from typing import Dict, List, Optional
+
+PET_FIELDS = ["name", "species", "breed", "age", "gender", "image", "images", "health_score", "videos_analyzed"]
+RECENT_VIDEOS = 5
+
+def _compact_video(video: Dict) -> Dict:
+    preliminary = video.get("preliminary_analysis") or {}
+    return {
+        "id": video.get("_id"),
+        "created_at": video.get("created_at"),
+        "analysis_status": video.get("analysis_status"),
+        "health_concerns": video.get("health_concerns", []),
+        "confidence_score": video.get("confidence_score"),
+        "activity_level": video.get("activity_level"),
+        "motion_score": preliminary.get("motion_score")
+    }
+
+def _trend(points: List[Dict]) -> str:
+    """Compare average motion of the newer half of recent videos with the older half"""
+    scores = [p["motion_score"] for p in points if p.get("motion_score") is not None]
+    if len(scores) < 2:
+        return "unknown"
+    half = len(scores) // 2
+    older = sum(scores[:half]) / half
+    newer = sum(scores[half:]) / (len(scores) - half)
+    if older == 0:
+        return "improving" if newer > 0 else "stable"
+    change = (newer - older) / older
+    if change > 0.2:
+        return "improving"
+    if change < -0.2:
+        return "declining"
+    return "stable"
+
+
+class PetSummaryView:
+    """
+    Materialized per-pet dashboard aggregate, updated incrementally from
+    repository writes to `pets` and `videos` instead of scanning on read.
+    """
+
+    def __init__(self):
+        self._pets: Dict[str, Dict] = {}
+        self._videos: Dict[str, Dict[str, Dict]] = {}  # pet_id -> video_id -> compact video
+        self._video_owner: Dict[str, str] = {}  # video_id -> pet_id
+        self._summaries: Dict[str, Dict] = {}  # pet_id -> cached summary
+
+    def apply_pet(self, operation: str, pet: Dict):
+        pet_id = pet.get("_id")
+        if pet_id is None:
+            return
+        if operation == "delete":
+            self._pets.pop(pet_id, None)
+        else:
+            self._pets[pet_id] = {field: pet.get(field) for field in PET_FIELDS}
+        self._summaries.pop(pet_id, None)
+
+    def apply_video(self, operation: str, video: Dict):
+        video_id = video.get("_id")
+        if video_id is None:
+            return
+        previous_owner = self._video_owner.pop(video_id, None)
+        if previous_owner is not None:
+            self._videos.get(previous_owner, {}).pop(video_id, None)
+            self._summaries.pop(previous_owner, None)
+        if operation == "delete":
+            return
+        pet_id = video.get("pet_id")
+        self._videos.setdefault(pet_id, {})[video_id] = _compact_video(video)
+        self._video_owner[video_id] = pet_id
+        self._summaries.pop(pet_id, None)
+
+    def _summarize(self, pet_id: str) -> Dict:
+        videos = sorted(self._videos.get(pet_id, {}).values(), key=lambda v: v.get("created_at") or "")
+        latest = videos[-1] if videos else None
+        completed = [v for v in videos if v.get("analysis_status") == "completed"][-RECENT_VIDEOS:]
+
+        recent_concerns = []
+        for video in reversed(completed):
+            for concern in video.get("health_concerns", []):
+                if concern not in recent_concerns:
+                    recent_concerns.append(concern)
+
+        points = [
+            {
+                "video_id": v["id"],
+                "created_at": v.get("created_at"),
+                "activity_level": v.get("activity_level"),
+                "motion_score": v.get("motion_score"),
+                "confidence_score": v.get("confidence_score")
+            }
+            for v in videos[-RECENT_VIDEOS:]
+        ]
+        return {
+            "id": pet_id,
+            **self._pets[pet_id],
+            "video_count": len(videos),
+            "latest_video_id": latest["id"] if latest else None,
+            "latest_analysis_status": latest.get("analysis_status") if latest else None,
+            "recent_concerns": recent_concerns,
+            "health_trend": {"direction": _trend(points), "points": points}
+        }
+
+    def summaries(self) -> List[Dict]:
+        result = []
+        for pet_id in self._pets:
+            if pet_id not in self._summaries:
+                self._summaries[pet_id] = self._summarize(pet_id)
+            result.append(self._summaries[pet_id])
+        return result
+
+
+_summary_view: Optional[PetSummaryView] = None
+_build_lock = asyncio.Lock()
+
+async def get_pet_summary_view(repository: JSONRepository) -> PetSummaryView:
+    """Build the view on first use; afterwards it follows repository writes"""
+    global _summary_view
+    if _summary_view is not None:
+        return _summary_view
+    async with _build_lock:
+        if _summary_view is not None:
+            return _summary_view
+        view = PetSummaryView()
+        # Subscribe before loading so no write between the two is missed
+        repository.subscribe("pets", view.apply_pet)
+        repository.subscribe("videos", view.apply_video)
+        async for pet in repository.iter_find("pets"):
+            if pet.get("_id") not in view._pets:
+                view.apply_pet("insert", pet)
+        async for video in repository.iter_find("videos"):
+            if video.get("_id") not in view._video_owner:
+                view.apply_video("insert", video)
+        _summary_view = view
+    return _summary_view
@@ -0,0 +1,245 @@
+import asyncio
+import bisect
+import math
+import re
+from collections import Counter
+from app.storage.json_repository import JSONRepository
+from app.storage.snapshots import read_snapshot, write_snapshot
+from typing import Dict, List, Optional, Set
+
+# Text fields and their weights in the combined term frequency
+FIELD_WEIGHTS = {"name": 3.0, "tags": 2.0, "description": 1.0}
+
+# (label, lower bound inclusive, upper bound exclusive)
+PRICE_BANDS = [
+    ("under_500", 0, 500),
+    ("500_1000", 500, 1000),
+    ("1000_2500", 1000, 2500),
+    ("2500_5000", 2500, 5000),
+    ("5000_plus", 5000, math.inf)
+]
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+def _as_list(value) -> List:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def price_band(price) -> Optional[str]:
+    if not isinstance(price, (int, float)):
+        return None
+    for label, low, high in PRICE_BANDS:
+        if low <= price < high:
+            return label
+    return None
+
+
+class ProductSearchIndex:
+    """
+    In-memory inverted index over product name, description and tags with
+    BM25 ranking, prefix expansion of the last query term and facet postings
+    for category, species and price band.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._terms: List[str] = []  # sorted, for prefix lookup
+        self._doc_terms: Dict[str, Dict[str, float]] = {}
+        self._doc_length: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._facets: Dict[str, Dict[str, Set[str]]] = {"category": {}, "species": {}, "price": {}}
+        self._doc_facets: Dict[str, Dict[str, List[str]]] = {}
+        self._docs: Dict[str, Dict] = {}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, product: Dict):
+        """Index or re-index a product"""
+        doc_id = product.get("_id")
+        if doc_id is None:
+            return
+        self.remove(doc_id)
+
+        weighted = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for value in _as_list(product.get(field)):
+                for term in tokenize(str(value)):
+                    weighted[term] += weight
+        for term, tf in weighted.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[doc_id] = tf
+        self._doc_terms[doc_id] = dict(weighted)
+        self._doc_length[doc_id] = sum(weighted.values())
+        self._total_length += self._doc_length[doc_id]
+
+        facets = {
+            "category": [str(v) for v in _as_list(product.get("category"))],
+            "species": [str(v) for v in _as_list(product.get("suitable_for"))],
+            "price": _as_list(price_band(product.get("price")))
+        }
+        for facet, values in facets.items():
+            for value in values:
+                self._facets[facet].setdefault(value, set()).add(doc_id)
+        self._doc_facets[doc_id] = facets
+        self._docs[doc_id] = product
+
+    def remove(self, doc_id: str):
+        if doc_id not in self._docs:
+            return
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                self._terms.pop(bisect.bisect_left(self._terms, term))
+        self._total_length -= self._doc_length.pop(doc_id)
+        for facet, values in self._doc_facets.pop(doc_id).items():
+            for value in values:
+                members = self._facets[facet][value]
+                members.discard(doc_id)
+                if not members:
+                    del self._facets[facet][value]
+        del self._docs[doc_id]
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\uffff")
+        return self._terms[start:end]
+
+    def search(
+        self,
+        q: str = "",
+        category: Optional[str] = None,
+        species: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Dict:
+        """Rank matching products and count facets over the full match set"""
+        allowed: Optional[Set[str]] = None
+        for facet, value in (("category", category), ("species", species)):
+            if value is not None:
+                members = self._facets[facet].get(value, set())
+                allowed = members if allowed is None else allowed & members
+
+        terms = tokenize(q)
+        if terms:
+            doc_count = len(self._docs)
+            avg_length = self._total_length / doc_count if doc_count else 0.0
+            # The last term is still being typed: match it as a prefix
+            query_terms = [[term] for term in terms[:-1]] + [self._expand_prefix(terms[-1])]
+            scores: Optional[Dict[str, float]] = None
+            for alternatives in query_terms:
+                term_scores: Dict[str, float] = {}
+                for term in alternatives:
+                    postings = self._postings.get(term)
+                    if not postings:
+                        # Unknown word: nothing can match every term
+                        continue
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for doc_id, tf in postings.items():
+                        if allowed is not None and doc_id not in allowed:
+                            continue
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_length[doc_id] / avg_length)
+                        score = idf * tf * (BM25_K1 + 1) / (tf + norm)
+                        term_scores[doc_id] = max(term_scores.get(doc_id, 0.0), score)
+                # Every query term must match
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+                if not scores:
+                    break
+            scores = scores or {}
+        else:
+            candidates = allowed if allowed is not None else self._docs.keys()
+            scores = {doc_id: 0.0 for doc_id in candidates}
+
+        facet_counts = {facet: Counter() for facet in self._facets}
+        matched = []
+        for doc_id, score in scores.items():
+            price = self._docs[doc_id].get("price")
+            if min_price is not None or max_price is not None:
+                if not isinstance(price, (int, float)):
+                    continue
+                if (min_price is not None and price < min_price) or (max_price is not None and price > max_price):
+                    continue
+            matched.append((score, doc_id))
+            for facet, values in self._doc_facets[doc_id].items():
+                facet_counts[facet].update(values)
+
+        if terms:
+            matched.sort(key=lambda item: (-item[0], item[1]))
+        else:
+            matched.sort(key=lambda item: str(self._docs[item[1]].get("name", "")))
+
+        return {
+            "total": len(matched),
+            "results": [
+                {**self._docs[doc_id], "score": round(score, 4)}
+                for score, doc_id in matched[offset:offset + limit]
+            ],
+            "facets": {facet: dict(counts) for facet, counts in facet_counts.items()}
+        }
+
+    def apply(self, operation: str, document: Dict):
+        """Repository listener keeping the index in sync with writes"""
+        if operation == "delete":
+            self.remove(document.get("_id"))
+        else:
+            self.add(document)
+
+
+_product_index: Optional[ProductSearchIndex] = None
+_build_lock = asyncio.Lock()
+SIDECAR = "products.search"
+
+async def get_product_index(repository: JSONRepository, use_sidecar: bool = False) -> ProductSearchIndex:
+    """
+    Build the index on first use; afterwards it follows repository writes.
+    With use_sidecar, a snapshot matching the products files is loaded
+    instead of rebuilding, and a fresh one is written after a rebuild.
+    """
+    global _product_index
+    if _product_index is not None:
+        return _product_index
+    async with _build_lock:
+        if _product_index is not None:
+            return _product_index
+        if use_sidecar:
+            # No await between validating and subscribing, so no write can slip in
+            index = read_snapshot(repository.sidecar_path(SIDECAR), repository.collection_checksum("products"))
+            if index is not None:
+                repository.subscribe("products", index.apply)
+                _product_index = index
+                return _product_index
+        index = ProductSearchIndex()
+        # Subscribe before loading so no write between the two is missed
+        repository.subscribe("products", index.apply)
+        for product in await repository.find("products"):
+            if product.get("_id") not in index._docs:
+                index.add(product)
+        _product_index = index
+        if use_sidecar:
+            save_product_index(repository)
+    return _product_index
+
+def save_product_index(repository: JSONRepository):
+    """Write the index sidecar; the index always reflects the committed products files"""
+    if _product_index is not None:
+        try:
+            write_snapshot(repository.sidecar_path(SIDECAR), repository.collection_checksum("products"), _product_index)
+        except Exception as e:
+            print(f"Error writing product index snapshot: {e}")
@@ -0,0 +1,34 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    # Spaces would break the collapsed-stack format
+    return f"{os.path.basename(code.co_filename)}:{name}".replace(" ", "_")
+
+def sample_stacks(seconds: float, interval: float = 0.005) -> str:
+    """
+    Sample every thread's stack with sys._current_frames() for `seconds` and
+    return collapsed stacks ("thread;outer;...;inner count" per line), the
+    input format of flamegraph.pl and speedscope. Blocks the calling thread.
+    """
+    me = threading.get_ident()
+    counts: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}").replace(" ", "_"))
+            counts[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
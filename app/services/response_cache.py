@@ -0,0 +1,69 @@
+import hashlib
+import json
+from collections import OrderedDict
+from fastapi import Request
+from fastapi.responses import Response
+from app.storage.json_repository import JSONRepository, get_repository
+from app.services.timing import phase
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+class ResponseCache:
+    """
+    Serialized JSON bodies keyed by route, query parameters and the versions
+    of the collections they were built from. Any write bumps a version, so
+    stale bodies are never served. Conditional requests get 304s.
+    """
+
+    def __init__(self, repository: JSONRepository, max_entries: int = 1024):
+        self._repo = repository
+        self.max_entries = max_entries
+        # (path, params) -> (versions, body, etag)
+        self._entries: "OrderedDict[Tuple, Tuple[Tuple[int, ...], bytes, str]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    async def respond(
+        self,
+        request: Request,
+        collections: List[str],
+        build: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+        # Read versions before building so a concurrent write can only make the body newer
+        versions = tuple(self._repo.get_version(collection) for collection in collections)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == versions:
+            self.stats["hits"] += 1
+            self._entries.move_to_end(key)
+            _, body, etag = entry
+        else:
+            self.stats["misses"] += 1
+            content = await build()
+            with phase("serialize"):
+                body = json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+            # Derived from the body so it is valid across workers and restarts
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            self._entries[key] = (versions, body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+_response_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(get_repository())
+    return _response_cache
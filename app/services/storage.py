@@ -1,28 +1,53 @@
 import aiofiles
+import hashlib
 import os
 import uuid
 from fastapi import UploadFile
 
+CHUNK_SIZE = 1024 * 1024
+
+def is_content_addressed(path: str) -> bool:
+    """Files named after the SHA-256 of their content never change"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return len(stem) == 64 and all(c in "0123456789abcdef" for c in stem)
+
+def write_content_addressed(data: bytes, folder: str, extension: str) -> str:
+    """Write bytes under a name derived from their SHA-256 (sync, for worker threads)"""
+    os.makedirs(folder, exist_ok=True)
+    file_path = os.path.join(folder, f"{hashlib.sha256(data).hexdigest()}{extension}")
+    if not os.path.exists(file_path):
+        temp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as out_file:
+            out_file.write(data)
+        os.replace(temp_path, file_path)
+    return file_path
+
+async def _save_upload(file: UploadFile, folder: str) -> str:
+    """Stream an upload to disk, naming it after the SHA-256 of its content"""
+    file_extension = os.path.splitext(file.filename)[1].lower()
+    os.makedirs(folder, exist_ok=True)
+    temp_path = os.path.join(folder, f"{uuid.uuid4()}.tmp")
+    digest = hashlib.sha256()
+
+    try:
+        async with aiofiles.open(temp_path, "wb") as out_file:
+            while chunk := await file.read(CHUNK_SIZE):
+                digest.update(chunk)
+                await out_file.write(chunk)
+        file_path = os.path.join(folder, f"{digest.hexdigest()}{file_extension}")
+        # Identical content is already stored under the same name
+        os.replace(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return file_path
+
 async def save_video(file: UploadFile) -> str:
     """Save uploaded video to disk"""
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join("uploads/videos", unique_filename)
-    
-    async with aiofiles.open(file_path, "wb") as out_file:
-        content = await file.read()
-        await out_file.write(content)
-    
-    return file_path
+    return await _save_upload(file, "uploads/videos")
 
 async def save_image(file: UploadFile, folder: str = "images") -> str:
     """Save uploaded image to disk"""
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(f"uploads/{folder}", unique_filename)
-    
-    async with aiofiles.open(file_path, "wb") as out_file:
-        content = await file.read()
-        await out_file.write(content)
-    
-    return file_path
+    return await _save_upload(file, f"uploads/{folder}")
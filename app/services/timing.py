@@ -0,0 +1,42 @@
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# Per-request phase totals in seconds; None outside a request
+_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_phases", default=None)
+
+def start_request() -> Dict[str, float]:
+    """Begin recording phases for the current request and return the recorder"""
+    phases: Dict[str, float] = {}
+    _phases.set(phases)
+    return phases
+
+def record(name: str, seconds: float):
+    """Add time to a phase of the current request; a no-op outside requests"""
+    phases = _phases.get()
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+@contextmanager
+def phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+@asynccontextmanager
+async def timed_lock(lock, name: str = "lock_wait"):
+    """Acquire an asyncio.Lock, recording only the time spent waiting for it"""
+    started = time.perf_counter()
+    async with lock:
+        record(name, time.perf_counter() - started)
+        yield
+
+def server_timing_header(phases: Dict[str, float], total: float) -> str:
+    """Format phases as a Server-Timing header value (durations in milliseconds)"""
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in phases.items()]
+    entries.append(f"app;dur={max(0.0, total - sum(phases.values())) * 1000:.1f}")
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
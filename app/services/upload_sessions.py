@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.services.storage import CHUNK_SIZE
+from typing import AsyncIterator, Dict, List, Optional
+
+# Outside uploads/, which the media route serves publicly
+SESSION_DIR = "data/upload_sessions"
+
+def _merge(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    """Add [start, end) to sorted, non-overlapping received ranges"""
+    merged = []
+    for low, high in sorted(ranges + [[start, end]]):
+        if merged and low <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], high)
+        else:
+            merged.append([low, high])
+    return merged
+
+def contiguous_offset(session: Dict) -> int:
+    """Bytes received without gaps from the start: where a client should resume"""
+    ranges = session["received"]
+    return ranges[0][1] if ranges and ranges[0][0] == 0 else 0
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadSessionError(Exception):
+    """Raised for requests that conflict with a session's state"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class UploadSessionStore:
+    """
+    Resumable uploads: a preallocated part file plus a JSON sidecar with the
+    received byte ranges, so sessions survive worker restarts. Chunks are
+    written in place with os.pwrite and may arrive out of order or in
+    parallel. Sessions idle longer than ttl are removed.
+    """
+
+    def __init__(self, folder: str = SESSION_DIR, ttl: float = 86400):
+        self.folder = folder
+        self.ttl = ttl
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Chunk writes in progress per session; finalize refuses while any are running
+        self._writers: Dict[str, int] = {}
+
+    def _meta_path(self, session_id: str) -> str:
+        return os.path.join(self.folder, f"{session_id}.json")
+
+    def _part_path(self, session_id: str) -> str:
+        return os.path.join(self.folder, f"{session_id}.part")
+
+    def _lock(self, session_id: str) -> asyncio.Lock:
+        if session_id not in self._locks:
+            self._locks[session_id] = asyncio.Lock()
+        return self._locks[session_id]
+
+    def _write_meta(self, session: Dict):
+        temp_path = f"{self._meta_path(session['id'])}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(session, f)
+        os.replace(temp_path, self._meta_path(session["id"]))
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        # Session ids are uuid4 hex; anything else cannot name a session file
+        if len(session_id) != 32 or not all(c in "0123456789abcdef" for c in session_id):
+            return None
+        try:
+            with open(self._meta_path(session_id), "r", encoding="utf-8") as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - session["updated_at"] > self.ttl:
+            self._remove(session_id)
+            return None
+        return session
+
+    def _remove(self, session_id: str):
+        for path in (self._meta_path(session_id), self._part_path(session_id)):
+            if os.path.exists(path):
+                os.remove(path)
+        self._locks.pop(session_id, None)
+
+    def expire_idle(self) -> int:
+        """Delete sessions idle for longer than the ttl"""
+        if not os.path.isdir(self.folder):
+            return 0
+        expired = 0
+        now = time.time()
+        for name in os.listdir(self.folder):
+            if not name.endswith(".json"):
+                continue
+            session_id = name[:-len(".json")]
+            try:
+                with open(self._meta_path(session_id), "r", encoding="utf-8") as f:
+                    updated_at = json.load(f)["updated_at"]
+            except (OSError, ValueError, KeyError):
+                continue
+            if now - updated_at > self.ttl and not self._lock(session_id).locked() and not self._writers.get(session_id):
+                self._remove(session_id)
+                expired += 1
+        return expired
+
+    def create(self, pet_id: str, filename: str, content_type: str, size: int) -> Dict:
+        self.expire_idle()
+        os.makedirs(self.folder, exist_ok=True)
+        now = time.time()
+        session = {
+            "id": uuid.uuid4().hex,
+            "pet_id": pet_id,
+            "filename": filename,
+            "content_type": content_type,
+            "size": size,
+            "received": [],
+            "created_at": now,
+            "updated_at": now
+        }
+        # Preallocate so every chunk is a plain positional write
+        with open(self._part_path(session["id"]), "wb") as f:
+            f.truncate(size)
+        self._write_meta(session)
+        return session
+
+    async def write_chunk(self, session_id: str, offset: int, chunks: AsyncIterator[bytes]) -> Dict:
+        """Write a streamed chunk at offset and record the range once fully written"""
+        if self.get(session_id) is None:
+            raise UploadSessionError(404, "Upload session not found")
+        # Registered under the lock, so finalize either sees this writer or has
+        # already removed the session; chunks still write in parallel
+        async with self._lock(session_id):
+            session = self.get(session_id)
+            if session is None:
+                raise UploadSessionError(404, "Upload session not found")
+            if offset < 0 or offset > session["size"]:
+                raise UploadSessionError(416, "Offset outside the upload")
+            fd = os.open(self._part_path(session_id), os.O_WRONLY)
+            self._writers[session_id] = self._writers.get(session_id, 0) + 1
+
+        position = offset
+        try:
+            try:
+                async for data in chunks:
+                    if position + len(data) > session["size"]:
+                        raise UploadSessionError(413, "Chunk extends past the declared upload size")
+                    if data:
+                        await run_in_threadpool(os.pwrite, fd, data, position)
+                        position += len(data)
+            finally:
+                os.close(fd)
+
+            # Only ranges that were written completely count as received
+            async with self._lock(session_id):
+                session = self.get(session_id)
+                if session is None:
+                    raise UploadSessionError(404, "Upload session not found")
+                if position > offset:
+                    session["received"] = _merge(session["received"], offset, position)
+                session["updated_at"] = time.time()
+                self._write_meta(session)
+        finally:
+            self._writers[session_id] -= 1
+            if not self._writers[session_id]:
+                del self._writers[session_id]
+        return session
+
+    async def finalize(self, session_id: str, folder: str) -> Dict:
+        """Move a complete upload into folder under its content hash; returns the session"""
+        async with self._lock(session_id):
+            session = self.get(session_id)
+            if session is None:
+                raise UploadSessionError(404, "Upload session not found")
+            if contiguous_offset(session) != session["size"]:
+                raise UploadSessionError(409, "Upload is incomplete")
+            if self._writers.get(session_id):
+                raise UploadSessionError(409, "Chunks are still being written")
+
+            digest = await run_in_threadpool(_hash_file, self._part_path(session_id))
+            extension = os.path.splitext(session["filename"])[1].lower()
+            os.makedirs(folder, exist_ok=True)
+            file_path = os.path.join(folder, f"{digest}{extension}")
+            os.replace(self._part_path(session_id), file_path)
+            os.remove(self._meta_path(session_id))
+        self._locks.pop(session_id, None)
+        session["file_path"] = file_path
+        return session
+
+    def abort(self, session_id: str) -> bool:
+        if self.get(session_id) is None:
+            return False
+        self._remove(session_id)
+        return True
+
+
+_session_store: Optional[UploadSessionStore] = None
+
+def get_upload_sessions() -> UploadSessionStore:
+    global _session_store
+    if _session_store is None:
+        _session_store = UploadSessionStore(ttl=settings.upload_session_ttl)
+    return _session_store
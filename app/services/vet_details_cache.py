@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from fastapi.concurrency import run_in_threadpool
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# Details that rarely change vs. ones worth refreshing often
+STATIC_FIELDS = ["place_id", "name", "formatted_address", "formatted_phone_number", "website", "photos", "geometry"]
+VOLATILE_FIELDS = ["rating", "opening_hours"]
+
+Fetcher = Callable[[List[str]], Awaitable[Optional[Dict]]]
+
+class VetDetailsCache:
+    """
+    On-disk cache of Places details keyed by place_id.
+    Static and volatile field groups expire separately; stale groups are
+    served immediately and refreshed field-by-field in the background.
+    """
+
+    def __init__(self, cache_dir: str, static_ttl: float, volatile_ttl: float):
+        self.cache_dir = Path(cache_dir)
+        self.static_ttl = static_ttl
+        self.volatile_ttl = volatile_ttl
+        self._memory: Dict[str, Dict] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def _path(self, place_id: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(place_id.encode('utf-8')).hexdigest()[:32]}.json"
+
+    def _read(self, place_id: str) -> Optional[Dict]:
+        path = self._path(place_id)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error reading vet details cache for {place_id}: {e}")
+            return None
+
+    def _write(self, place_id: str, entry: Dict):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(place_id)
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    async def _load(self, place_id: str) -> Optional[Dict]:
+        if place_id not in self._memory:
+            entry = await run_in_threadpool(self._read, place_id)
+            if entry is None:
+                return None
+            self._memory[place_id] = entry
+        return self._memory[place_id]
+
+    async def _refresh(self, place_id: str, fields: List[str], fetcher: Fetcher) -> Optional[Dict]:
+        result = await fetcher(fields)
+        if result is None:
+            return None
+        now = time.time()
+        entry = self._memory.get(place_id) or {"result": {}, "static_fetched_at": 0, "volatile_fetched_at": 0}
+        entry = {**entry, "result": {**entry["result"], **result}}
+        if any(field in STATIC_FIELDS for field in fields):
+            entry["static_fetched_at"] = now
+        if any(field in VOLATILE_FIELDS for field in fields):
+            entry["volatile_fetched_at"] = now
+        self._memory[place_id] = entry
+        await run_in_threadpool(self._write, place_id, entry)
+        return entry
+
+    def _start_refresh(self, place_id: str, fields: List[str], fetcher: Fetcher) -> asyncio.Task:
+        """Start a refresh unless one is already running for this place"""
+        task = self._refreshing.get(place_id)
+        if task is not None:
+            return task
+
+        async def run():
+            try:
+                return await self._refresh(place_id, fields, fetcher)
+            finally:
+                self._refreshing.pop(place_id, None)
+
+        task = asyncio.ensure_future(run())
+        self._refreshing[place_id] = task
+        return task
+
+    def _refresh_in_background(self, place_id: str, fields: List[str], fetcher: Fetcher):
+        def log_failure(done: asyncio.Task):
+            if not done.cancelled() and done.exception() is not None:
+                print(f"Background refresh of vet details {place_id} failed: {done.exception()}")
+
+        self._start_refresh(place_id, fields, fetcher).add_done_callback(log_failure)
+
+    async def get(self, place_id: str, fetcher: Fetcher) -> Optional[Dict]:
+        """
+        Return cached details, fetching synchronously only on a cold miss.
+        fetcher(fields) returns the Places `result` dict or None if not found.
+        """
+        entry = await self._load(place_id)
+        if entry is None:
+            # Concurrent cold misses share one upstream call
+            entry = await asyncio.shield(self._start_refresh(place_id, STATIC_FIELDS + VOLATILE_FIELDS, fetcher))
+            return entry["result"] if entry else None
+
+        now = time.time()
+        stale_fields = []
+        if now - entry.get("static_fetched_at", 0) > self.static_ttl:
+            stale_fields += STATIC_FIELDS
+        if now - entry.get("volatile_fetched_at", 0) > self.volatile_ttl:
+            stale_fields += VOLATILE_FIELDS
+        if stale_fields:
+            self._refresh_in_background(place_id, stale_fields, fetcher)
+        return entry["result"]
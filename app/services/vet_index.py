@@ -0,0 +1,175 @@
+import asyncio
+import json
+import math
+import os
+import time
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from app.services.geo_cache import EARTH_RADIUS_M
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Grid cell size in degrees (~5.5km of latitude)
+GRID_DEGREES = 0.05
+
+def haversine_many(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Vectorized great-circle distance in metres from one point to many"""
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    dphi = phi2 - phi1
+    dlambda = np.radians(lngs - lng)
+    a = np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def _grid_cell(lat: float, lng: float) -> Tuple[int, int]:
+    return math.floor(lat / GRID_DEGREES), math.floor(lng / GRID_DEGREES)
+
+
+class VetIndex:
+    """
+    Local store of every clinic seen from the Places API, with a lat/lng grid
+    index for radius queries and a record of which areas were fully fetched.
+    """
+
+    def __init__(self, path: str = "data/vet_clinics.json", save_interval: float = 30.0):
+        self.path = Path(path)
+        self.save_interval = save_interval
+        self._clinics: Dict[str, Dict] = {}
+        self._grid: Dict[Tuple[int, int], set] = {}
+        # Circles whose complete result set came from upstream: lat, lng, radius, fetched_at
+        self._coverage = np.empty((0, 4))
+        self._loaded = False
+        self._dirty = False
+        # One save at a time, so writers never share the temp file
+        self._save_lock = asyncio.Lock()
+        self._save_task: Optional[asyncio.Task] = None
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for clinic in data.get("clinics", []):
+                self._put(clinic)
+            if data.get("coverage"):
+                self._coverage = np.array(data["coverage"], dtype=float).reshape(-1, 4)
+        except Exception as e:
+            print(f"Error loading vet index: {e}")
+
+    def _write(self, clinics: List[Dict], coverage: List[List[float]]):
+        payload = json.dumps({"clinics": clinics, "coverage": coverage}, ensure_ascii=False)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(temp_path, self.path)
+
+    async def save(self):
+        """Persist clinics and coverage atomically if anything changed"""
+        async with self._save_lock:
+            if not self._dirty:
+                return
+            # Stored clinics are replaced, never mutated, so a shallow copy is a stable snapshot
+            clinics = list(self._clinics.values())
+            coverage = self._coverage.tolist()
+            self._dirty = False
+            try:
+                await run_in_threadpool(self._write, clinics, coverage)
+            except Exception:
+                self._dirty = True
+                raise
+
+    def schedule_save(self):
+        """Save once save_interval from now, batching every change made until then"""
+        if self._save_task is not None and not self._save_task.done():
+            return
+
+        async def run():
+            await asyncio.sleep(self.save_interval)
+            try:
+                await self.save()
+            except Exception as e:
+                print(f"Error saving vet index: {e}")
+
+        self._save_task = asyncio.ensure_future(run())
+
+    def _put(self, clinic: Dict):
+        # Opening state goes stale long before coverage does, so it is never indexed
+        clinic.pop("open_now", None)
+        location = clinic.get("location") or {}
+        if not clinic.get("id") or "lat" not in location or "lng" not in location:
+            return
+        previous = self._clinics.get(clinic["id"])
+        if previous:
+            old_location = previous["location"]
+            self._grid.get(_grid_cell(old_location["lat"], old_location["lng"]), set()).discard(clinic["id"])
+            clinic = {**previous, **{k: v for k, v in clinic.items() if v is not None}}
+        self._clinics[clinic["id"]] = clinic
+        self._grid.setdefault(_grid_cell(location["lat"], location["lng"]), set()).add(clinic["id"])
+
+    def add_clinics(self, clinics: List[Dict]):
+        self._load()
+        for clinic in clinics:
+            self._put(dict(clinic))
+        self._dirty = True
+
+    def add_coverage(self, lat: float, lng: float, radius: float, max_age: float):
+        """Record that every clinic within radius of (lat, lng) is known"""
+        self._load()
+        if len(self._coverage):
+            # Drop circles too old to answer from and circles the new one fully contains
+            self._coverage = self._coverage[self._coverage[:, 3] >= time.time() - max_age]
+            distances = haversine_many(lat, lng, self._coverage[:, 0], self._coverage[:, 1])
+            self._coverage = self._coverage[distances + self._coverage[:, 2] > radius]
+        self._coverage = np.vstack([self._coverage, [lat, lng, radius, time.time()]])
+        self._dirty = True
+
+    def covers(self, lat: float, lng: float, radius: float, max_age: float) -> bool:
+        """True if the query circle lies inside a fresh, fully fetched circle"""
+        self._load()
+        if not len(self._coverage):
+            return False
+        fresh = self._coverage[self._coverage[:, 3] >= time.time() - max_age]
+        if not len(fresh):
+            return False
+        distances = haversine_many(lat, lng, fresh[:, 0], fresh[:, 1])
+        return bool(np.any(distances + radius <= fresh[:, 2]))
+
+    def query(self, lat: float, lng: float, radius: float) -> List[Dict]:
+        """Clinics within radius, nearest first and higher rating first on ties"""
+        self._load()
+        dlat = radius / 111320
+        dlng = radius / (111320 * max(math.cos(math.radians(lat)), 0.01))
+        min_cell = _grid_cell(lat - dlat, lng - dlng)
+        max_cell = _grid_cell(lat + dlat, lng + dlng)
+
+        ids = []
+        for cell_lat in range(min_cell[0], max_cell[0] + 1):
+            for cell_lng in range(min_cell[1], max_cell[1] + 1):
+                ids.extend(self._grid.get((cell_lat, cell_lng), ()))
+        if not ids:
+            return []
+
+        clinics = [self._clinics[clinic_id] for clinic_id in ids]
+        lats = np.fromiter((c["location"]["lat"] for c in clinics), dtype=float, count=len(clinics))
+        lngs = np.fromiter((c["location"]["lng"] for c in clinics), dtype=float, count=len(clinics))
+        ratings = np.fromiter((c.get("rating") or 0.0 for c in clinics), dtype=float, count=len(clinics))
+        distances = haversine_many(lat, lng, lats, lngs)
+
+        inside = np.nonzero(distances <= radius)[0]
+        order = inside[np.lexsort((-ratings[inside], np.round(distances[inside])))]
+        return [{**clinics[i], "distance": round(float(distances[i]))} for i in order]
+
+
+_vet_index: Optional[VetIndex] = None
+
+def get_vet_index() -> VetIndex:
+    global _vet_index
+    if _vet_index is None:
+        from app.config import settings
+        _vet_index = VetIndex(save_interval=settings.vets_index_save_interval)
+    return _vet_index
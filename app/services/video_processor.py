@@ -1,25 +1,118 @@
+import math
 import cv2
-import os
+import numpy as np
+from app.config import settings
+from app.services.frame_encoder import resize_frame
+from app.services.storage import write_content_addressed
+from typing import Optional
 
-def process_video(video_path: str) -> dict:
-    """Process video to extract metadata"""
+THUMBNAIL_DIR = "uploads/thumbnails"
+MOTION_FRAME_EDGE = 160
+
+def _evenly_spaced(total: int, count: int) -> list:
+    if total <= 0 or count <= 0:
+        return []
+    return sorted({int(total * i / count) for i in range(count)})
+
+def _write_image(image, folder: str) -> str:
+    _, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return write_content_addressed(buffer.tobytes(), folder, ".jpg")
+
+def process_video(
+    video_path: str,
+    num_frames: int = 5,
+    preview_frames: int = 8,
+    thumbnail_dir: str = THUMBNAIL_DIR,
+    frame_max_edge: Optional[int] = None,
+    motion_fps: Optional[float] = None,
+    motion_max_samples: Optional[int] = None
+) -> dict:
+    """
+    Ingest a video in a single decode pass.
+    Returns metadata, thumbnail and preview strip paths, the (downscaled)
+    frames used for AI analysis and small grayscale frames sampled at
+    motion_fps (more sparsely for clips longer than motion_max_samples
+    allows) for local activity analysis.
+    """
+    frame_max_edge = settings.frame_max_edge if frame_max_edge is None else frame_max_edge
+    motion_fps = settings.motion_sample_fps if motion_fps is None else motion_fps
+    motion_max_samples = settings.motion_max_samples if motion_max_samples is None else motion_max_samples
     cap = cv2.VideoCapture(video_path)
-    
+
     if not cap.isOpened():
         raise ValueError("Cannot open video file")
-    
-    # Get video properties
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    try:
+        # Get video properties
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        analysis_indices = _evenly_spaced(frame_count, num_frames)
+        preview_indices = _evenly_spaced(frame_count, preview_frames)
+        motion_step = max(1, round(fps / motion_fps)) if fps > 0 and motion_fps > 0 else 0
+        if motion_step and motion_max_samples > 0:
+            # Bounds the stored motion timeline for long clips
+            motion_step = max(motion_step, math.ceil(frame_count / motion_max_samples))
+        motion_indices = set(range(0, frame_count, motion_step)) if motion_step else set()
+        wanted = set(analysis_indices) | set(preview_indices) | motion_indices
+        last_wanted = max(wanted) if wanted else -1
+
+        analysis = []
+        preview = []
+        motion = []
+        motion_times = []
+        decoded = 0
+        # Sequential grab() is cheaper than seeking: frames we don't need are never converted
+        while decoded <= last_wanted:
+            if not cap.grab():
+                break
+            idx = decoded
+            decoded += 1
+            if idx not in wanted:
+                continue
+            ret, frame = cap.retrieve()
+            if not ret:
+                continue
+            if idx in analysis_indices:
+                analysis.append(resize_frame(frame, frame_max_edge))
+            if idx in preview_indices:
+                preview.append(resize_frame(frame, 160))
+            if idx in motion_indices:
+                small = resize_frame(frame, MOTION_FRAME_EDGE)
+                motion.append(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+                motion_times.append(idx / fps)
+    finally:
+        cap.release()
+
+    if not analysis:
+        raise ValueError("No frames could be decoded from video")
+
+    # Containers sometimes report a wrong frame count
+    if decoded < frame_count and decoded <= last_wanted:
+        frame_count = decoded
     duration = frame_count / fps if fps > 0 else 0
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    
-    cap.release()
-    
+
+    thumbnail_path = _write_image(analysis[len(analysis) // 2], thumbnail_dir)
+    preview_path = None
+    if preview:
+        cell_h = min(p.shape[0] for p in preview)
+        strip = np.hstack([
+            p if p.shape[0] == cell_h
+            else cv2.resize(p, (round(p.shape[1] * cell_h / p.shape[0]), cell_h), interpolation=cv2.INTER_AREA)
+            for p in preview
+        ])
+        preview_path = _write_image(strip, thumbnail_dir)
+
     return {
         "duration": duration,
         "fps": fps,
         "frame_count": frame_count,
-        "resolution": f"{width}x{height}"
+        "resolution": f"{width}x{height}",
+        "thumbnail_path": thumbnail_path,
+        "preview_path": preview_path,
+        "frames": analysis,
+        "motion_frames": motion,
+        "motion_times": motion_times
     }
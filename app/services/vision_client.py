@@ -0,0 +1,171 @@
+import asyncio
+import random
+import time
+from app.config import settings
+from typing import Dict, List, Optional
+
+# Rough per-image token cost used for rate limiting (OpenAI vision pricing)
+_LOW_DETAIL_IMAGE_TOKENS = 85
+_HIGH_DETAIL_IMAGE_TOKENS = 765
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, amount: float = 1) -> float:
+        """Take tokens if available; otherwise return the seconds to wait"""
+        self._refill()
+        if self._tokens >= amount:
+            self._tokens -= amount
+            return 0.0
+        return (amount - self._tokens) / self.rate
+
+    async def acquire(self, amount: float = 1):
+        # Requests larger than the bucket would never be satisfied
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                wait = self.try_acquire(amount)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+
+def estimate_tokens(messages: List[Dict], max_tokens: int) -> int:
+    """Estimate the token cost of a chat request for rate limiting"""
+    tokens = max_tokens
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += len(content) // 4
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                tokens += len(part.get("text", "")) // 4
+            elif part.get("type") == "image_url":
+                detail = part.get("image_url", {}).get("detail", "auto")
+                tokens += _LOW_DETAIL_IMAGE_TOKENS if detail == "low" else _HIGH_DETAIL_IMAGE_TOKENS
+    return tokens
+
+
+def _is_retryable(error: Exception) -> bool:
+    from openai import APIConnectionError, APIStatusError, APITimeoutError
+    
+    if isinstance(error, (APITimeoutError, APIConnectionError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class VisionClient:
+    """
+    OpenAI chat client with request/token rate limiting, bounded concurrency,
+    jittered exponential backoff on 429/5xx/timeouts and a per-call timeout.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 4,
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 60000,
+        max_retries: int = 4,
+        timeout: float = 60.0,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0
+    ):
+        # Imported here so loading this module (e.g. for TokenBucket) stays cheap
+        from openai import AsyncOpenAI
+        
+        # Retries are handled here so the SDK must not retry on its own
+        self._client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0, timeout=timeout)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._requests = TokenBucket(requests_per_minute / 60, max(1, requests_per_minute / 60 * 5))
+        self._tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # Full jitter
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def chat(self, messages: List[Dict], model: str, max_tokens: int = 1000):
+        """Create a chat completion, retrying transient failures"""
+        cost = estimate_tokens(messages, max_tokens)
+        attempt = 0
+        while True:
+            await self._requests.acquire()
+            await self._tokens.acquire(cost)
+            try:
+                async with self._semaphore:
+                    return await asyncio.wait_for(
+                        self._client.chat.completions.create(
+                            model=model,
+                            messages=messages,
+                            max_tokens=max_tokens
+                        ),
+                        timeout=self.timeout
+                    )
+            except Exception as e:
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                print(f"Vision call failed ({type(e).__name__}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def close(self):
+        await self._client.close()
+
+
+_vision_client: Optional[VisionClient] = None
+
+def get_vision_client() -> Optional[VisionClient]:
+    """Return the shared vision client, or None if no API key is configured"""
+    global _vision_client
+    if _vision_client is None and settings.openai_api_key:
+        _vision_client = VisionClient(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            max_concurrency=settings.vision_max_concurrency,
+            requests_per_minute=settings.vision_requests_per_minute,
+            tokens_per_minute=settings.vision_tokens_per_minute,
+            max_retries=settings.vision_max_retries,
+            timeout=settings.vision_timeout
+        )
+    return _vision_client
+
+async def close_vision_client():
+    """Close the shared vision client's connection pool"""
+    global _vision_client
+    if _vision_client is not None:
+        await _vision_client.close()
+        _vision_client = None
@@ -0,0 +1,89 @@
+import io
+import json
+import re
+import tarfile
+import time
+from typing import Any, BinaryIO, Dict, Iterator, List
+
+BACKUP_FORMAT = 1
+MANIFEST = "manifest.json"
+_COLLECTION_MEMBER = re.compile(r"^collections/([A-Za-z0-9_-]+)\.json$")
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only sink whose contents are drained after every tar member"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self):
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _add_member(archive: tarfile.TarFile, name: str, body: bytes, mtime: float):
+    info = tarfile.TarInfo(name)
+    info.size = len(body)
+    info.mtime = int(mtime)
+    archive.addfile(info, io.BytesIO(body))
+
+def iter_backup_archive(snapshot: Dict[str, Any]) -> Iterator[bytes]:
+    """
+    Stream a repository snapshot as tar.gz: one JSON array per collection plus
+    a manifest with versions and counts. Synchronous, so a StreamingResponse
+    runs the serialization and compression in a worker thread.
+    """
+    created_at = time.time()
+    buffer = _ChunkBuffer()
+    counts = {}
+    with tarfile.open(fileobj=buffer, mode="w|gz") as archive:
+        for collection, parts in snapshot["collections"].items():
+            documents = [doc for part in parts for doc in part]
+            counts[collection] = len(documents)
+            body = json.dumps(documents, ensure_ascii=False, default=str).encode("utf-8")
+            _add_member(archive, f"collections/{collection}.json", body, created_at)
+            yield buffer.drain()
+        manifest = {
+            "format": BACKUP_FORMAT,
+            "created_at": created_at,
+            "versions": snapshot["versions"],
+            "counts": counts
+        }
+        _add_member(archive, MANIFEST, json.dumps(manifest, indent=2).encode("utf-8"), created_at)
+    yield buffer.drain()
+
+def read_backup_archive(fileobj: BinaryIO) -> Dict[str, List[Dict]]:
+    """Parse an archive written by iter_backup_archive; members are read, never extracted"""
+    collections = {}
+    manifest = None
+    with tarfile.open(fileobj=fileobj, mode="r:gz") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            if member.name == MANIFEST:
+                manifest = json.load(archive.extractfile(member))
+                continue
+            match = _COLLECTION_MEMBER.match(member.name)
+            if match is None:
+                raise ValueError(f"Unexpected archive member: {member.name}")
+            documents = json.load(archive.extractfile(member))
+            if not isinstance(documents, list):
+                raise ValueError(f"{member.name} is not a list of documents")
+            if not all(isinstance(doc, dict) and "_id" in doc for doc in documents):
+                raise ValueError(f"{member.name} holds a document that is not an object with an _id")
+            collections[match.group(1)] = documents
+
+    if manifest is None or manifest.get("format") != BACKUP_FORMAT:
+        raise ValueError("Missing or unsupported backup manifest")
+    for collection, count in manifest.get("counts", {}).items():
+        if len(collections.get(collection, [])) != count:
+            raise ValueError(f"Backup of {collection} is incomplete")
+    return collections
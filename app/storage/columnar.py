@@ -0,0 +1,248 @@
+import math
+import numpy as np
+from app.storage.query import MISSING, RANGE_OPERATORS, is_operator, match_value
+from typing import Any, Dict, Iterator, List, Optional
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+# Every int up to this magnitude is exact in float64
+EXACT_FLOAT_INT = 2 ** 53
+# Rows materialized per batch when iterating
+BATCH_ROWS = 1024
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _is_code_scalar(value: Any) -> bool:
+    # No ints or floats: 1, 1.0 and True share one dictionary entry
+    return value is None or isinstance(value, (str, bool))
+
+def _compact(value: Any, pool: Dict[Any, Any]) -> Any:
+    """
+    Deep copy of a nested value sharing equal strings, and equal lists of
+    strings (stored as tuples), with every other row through one pool
+    """
+    if isinstance(value, str):
+        return pool.setdefault(value, value)
+    if isinstance(value, list):
+        items = [_compact(item, pool) for item in value]
+        if all(isinstance(item, str) for item in items):
+            items = tuple(items)
+            return pool.setdefault(items, items)
+        return items
+    if isinstance(value, dict):
+        return {_compact(k, pool): _compact(v, pool) for k, v in value.items()}
+    return value
+
+def _copy(value: Any) -> Any:
+    """Fresh document value from its compact form"""
+    if isinstance(value, tuple):
+        return list(value)
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    return value
+
+def _int_bound(op: str, bound: Any) -> Optional[int]:
+    """An int bound giving the same comparison against ints, or None if there is none in int64"""
+    if isinstance(bound, float):
+        if not math.isfinite(bound):
+            return None
+        if not bound.is_integer():
+            # x > 2.5 is x > 2, x >= 2.5 is x >= 3
+            bound = math.floor(bound) if op in ("$gt", "$lte") else math.ceil(bound)
+    bound = int(bound)
+    return bound if INT64_MIN <= bound <= INT64_MAX else None
+
+
+class ColumnarTable:
+    """
+    Column-oriented store of one storage key's documents, cached in place of
+    the list of dicts. Fields whose values are all ints are int64 arrays;
+    ints mixed with floats are float64 arrays plus a mask of the int rows,
+    as long as every int is exact in float64. Strings, booleans and None are
+    dictionary encoded as int32 codes. Anything else (lists, objects, huge
+    ints) stays one Python value per row, with equal strings and lists of
+    strings shared across rows, and is matched row by row. Each row's field
+    order is kept as a dictionary-encoded shape, so table[i] rebuilds the
+    stored document exactly, as a fresh copy. Read-only: writers build a
+    new table.
+    """
+
+    def __init__(self, rows: List[Dict]):
+        self.size = len(rows)
+        self.numeric: Dict[str, np.ndarray] = {}
+        self.int_rows: Dict[str, np.ndarray] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        self.dictionaries: Dict[str, Dict[Any, int]] = {}
+        self.values: Dict[str, List[Any]] = {}
+        self.objects: Dict[str, List[Any]] = {}
+        # Fields absent from some rows -> rows that have them
+        self.present: Dict[str, np.ndarray] = {}
+
+        shape_ids: Dict[tuple, int] = {}
+        self.shape_codes = np.empty(self.size, dtype=np.int32)
+        columns: Dict[str, List[Any]] = {}
+        for i, row in enumerate(rows):
+            self.shape_codes[i] = shape_ids.setdefault(tuple(row), len(shape_ids))
+            for field, value in row.items():
+                column = columns.get(field)
+                if column is None:
+                    column = columns[field] = [MISSING] * self.size
+                column[i] = value
+        self.shapes = list(shape_ids)
+
+        pool: Dict[Any, Any] = {}
+        for field, column in columns.items():
+            present = [value for value in column if value is not MISSING]
+            if len(present) < self.size:
+                self.present[field] = np.fromiter((value is not MISSING for value in column), dtype=bool, count=self.size)
+            if all(_is_int(value) and INT64_MIN <= value <= INT64_MAX for value in present):
+                self.numeric[field] = np.array([0 if value is MISSING else value for value in column], dtype=np.int64)
+            elif all(_is_number(value) and (not _is_int(value) or abs(value) <= EXACT_FLOAT_INT) for value in present):
+                self.numeric[field] = np.array([np.nan if value is MISSING else value for value in column], dtype=np.float64)
+                int_rows = np.fromiter((_is_int(value) for value in column), dtype=bool, count=self.size)
+                if int_rows.any():
+                    self.int_rows[field] = int_rows
+            elif all(_is_code_scalar(value) for value in present):
+                dictionary: Dict[Any, int] = {}
+                codes = np.empty(self.size, dtype=np.int32)
+                for i, value in enumerate(column):
+                    codes[i] = -1 if value is MISSING else dictionary.setdefault(value, len(dictionary))
+                self.codes[field] = codes
+                self.dictionaries[field] = dictionary
+                self.values[field] = list(dictionary)
+            else:
+                self.objects[field] = [None if value is MISSING else _compact(value, pool) for value in column]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, i: int) -> Dict:
+        return self.take([i])[0]
+
+    def __iter__(self) -> Iterator[Dict]:
+        for start in range(0, self.size, BATCH_ROWS):
+            yield from self.take(np.arange(start, min(start + BATCH_ROWS, self.size)))
+
+    def _column(self, field: str, indices: np.ndarray) -> List[Any]:
+        """Python values of a field for the given rows (placeholders where absent)"""
+        if field in self.numeric:
+            values = self.numeric[field][indices].tolist()
+            int_rows = self.int_rows.get(field)
+            if int_rows is not None:
+                values = [int(value) if is_int else value for value, is_int in zip(values, int_rows[indices].tolist())]
+            return values
+        if field in self.codes:
+            lookup = self.values[field]
+            return [lookup[code] for code in self.codes[field][indices].tolist()]
+        column = self.objects[field]
+        return [_copy(column[i]) for i in indices.tolist()]
+
+    def take(self, indices) -> List[Dict]:
+        """Fresh copies of the documents at the given row indices, in that order"""
+        indices = np.asarray(indices, dtype=np.intp)
+        shape_codes = self.shape_codes[indices].tolist()
+        fields = {field for code in set(shape_codes) for field in self.shapes[code]}
+        columns = {field: self._column(field, indices) for field in fields}
+        return [
+            {field: columns[field][position] for field in self.shapes[code]}
+            for position, code in enumerate(shape_codes)
+        ]
+
+    def _field_values(self, field: str) -> List[Any]:
+        """Every row's value of a field, MISSING where absent"""
+        values = self._column(field, np.arange(self.size))
+        present = self.present.get(field)
+        if present is not None:
+            values = [value if has else MISSING for value, has in zip(values, present.tolist())]
+        return values
+
+    def _row_mask(self, field: str, condition: Any) -> np.ndarray:
+        return np.fromiter(
+            (match_value(value, condition) for value in self._field_values(field)),
+            dtype=bool,
+            count=self.size
+        )
+
+    def _numeric_mask(self, field: str, condition: Any) -> Optional[np.ndarray]:
+        """Vectorized match, or None when the comparison cannot be made exactly in the column's dtype"""
+        column = self.numeric[field]
+        is_int64 = column.dtype == np.int64
+        if is_operator(condition):
+            mask = np.ones(self.size, dtype=bool)
+            for op, bound in condition.items():
+                if op not in RANGE_OPERATORS or not _is_number(bound):
+                    return None
+                if is_int64:
+                    bound = _int_bound(op, bound)
+                elif _is_int(bound) and abs(bound) > EXACT_FLOAT_INT:
+                    bound = None
+                if bound is None:
+                    return None
+                # NaN (absent) compares False, as a missing field should
+                mask &= RANGE_OPERATORS[op](column, bound)
+            return mask
+        if not (_is_number(condition) or isinstance(condition, bool)):
+            return np.zeros(self.size, dtype=bool)
+        if is_int64:
+            if isinstance(condition, float) and not condition.is_integer():
+                return np.zeros(self.size, dtype=bool)
+            condition = _int_bound("$eq", condition)
+        elif _is_int(condition) and abs(condition) > EXACT_FLOAT_INT:
+            condition = None
+        if condition is None:
+            return None
+        return column == condition
+
+    def _mask(self, field: str, condition: Any) -> np.ndarray:
+        if field in self.numeric:
+            mask = self._numeric_mask(field, condition)
+            if mask is None:
+                return self._row_mask(field, condition)
+            present = self.present.get(field)
+            return mask if present is None else mask & present
+
+        if field in self.codes:
+            if is_operator(condition):
+                return self._row_mask(field, condition)
+            try:
+                code = self.dictionaries[field].get(condition)
+            except TypeError:  # unhashable condition cannot equal a scalar
+                code = None
+            if code is None:
+                return np.zeros(self.size, dtype=bool)
+            return self.codes[field] == code
+
+        if field in self.objects:
+            return self._row_mask(field, condition)
+        # No row has this field
+        return np.zeros(self.size, dtype=bool)
+
+    def filter(self, query: Optional[Dict]) -> np.ndarray:
+        """Ascending row indices matching every condition of the query"""
+        mask = np.ones(self.size, dtype=bool)
+        for field, condition in (query or {}).items():
+            mask &= self._mask(field, condition)
+        return np.flatnonzero(mask)
+
+    def count(self, query: Optional[Dict]) -> int:
+        if not query:
+            return self.size
+        return int(self.filter(query).size)
+
+    def distinct(self, field: str) -> List[Any]:
+        if field in self.numeric:
+            present = self.present.get(field)
+            rows = np.flatnonzero(present) if present is not None else np.arange(self.size)
+            _, first = np.unique(self.numeric[field][rows], return_index=True)
+            # Original values, so ints stay ints
+            return self._column(field, rows[first])
+        if field in self.codes:
+            return list(self.values[field])
+        if field in self.objects:
+            return list({value for value in self._field_values(field) if value is not MISSING})
+        return []
@@ -1,76 +1,250 @@
 import json
 import os
+import re
 import asyncio
 import uuid
 import copy
-from typing import List, Dict, Optional, Any
+import hashlib
+from contextlib import AsyncExitStack
+from typing import List, Dict, Optional, Any, Callable, AsyncIterator, Iterable, Sequence
 from datetime import datetime
 from pathlib import Path
+from app.services.timing import phase, timed_lock
+from app.storage.query import is_operator, matches
+from app.storage.snapshots import file_checksum, read_snapshot, write_snapshot
+
+# Shard values usable as file names as-is; anything else is hashed
+_SAFE_SHARD = re.compile(r"^[A-Za-z0-9_-]{1,100}$")
+UNKEYED_PARTITION = "_unkeyed"
 
 class JSONRepository:
-    def __init__(self, data_dir: str = "data"):
+    def __init__(
+        self,
+        data_dir: str = "data",
+        partitions: Optional[Dict[str, str]] = None,
+        columnar: Optional[Iterable[str]] = None
+    ):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        # Storage keys: a collection name, or "<collection>/<partition>" for partitioned collections
         self._locks = {}
         self._cache = {}
+        self._listeners: Dict[str, List[Callable]] = {}
+        self._versions: Dict[str, int] = {}
+        # collection -> shard field, e.g. {"videos": "pet_id"}
+        self.partitions: Dict[str, str] = dict(partitions or {})
+        self._partition_keys: Dict[str, set] = {}
+        # Collections cached as a ColumnarTable per storage key instead of a list of dicts
+        self.columnar = set(columnar or [])
+        # Storage keys written since their sidecar snapshot was last saved
+        self._dirty = set()
+        # Serializes snapshot and restore, the only operations holding several locks
+        self._multi_lock = asyncio.Lock()
     
-    def _get_lock(self, collection: str) -> asyncio.Lock:
-        if collection not in self._locks:
-            self._locks[collection] = asyncio.Lock()
-        return self._locks[collection]
+    def get_version(self, collection: str) -> int:
+        """Monotonically increasing counter bumped on every committed write"""
+        return self._versions.get(collection, 0)
     
-    def _get_file_path(self, collection: str) -> Path:
-        return self.data_dir / f"{collection}.json"
+    def subscribe(self, collection: str, listener: Callable[[str, Dict], None]):
+        """Register listener(operation, document) called after each committed write"""
+        self._listeners.setdefault(collection, []).append(listener)
     
-    async def _load_data(self, collection: str, use_cache: bool = True) -> List[Dict]:
-        file_path = self._get_file_path(collection)
-        
+    def _notify(self, collection: str, operation: str, document: Dict):
+        self._versions[collection] = self._versions.get(collection, 0) + 1
+        for listener in self._listeners.get(collection, []):
+            try:
+                with phase("deepcopy"):
+                    document_copy = copy.deepcopy(document)
+                listener(operation, document_copy)
+            except Exception as e:
+                print(f"Error in {collection} listener: {e}")
+    
+    def _get_lock(self, key: str) -> asyncio.Lock:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+    
+    def _get_file_path(self, key: str) -> Path:
+        return self.data_dir / f"{key}.json"
+    
+    def _storage_key(self, collection: str, shard_value: Any) -> str:
+        """Storage key of the partition holding documents with this shard value"""
+        if shard_value is None:
+            name = UNKEYED_PARTITION
+        elif _SAFE_SHARD.match(str(shard_value)) and str(shard_value) != UNKEYED_PARTITION:
+            name = str(shard_value)
+        else:
+            name = hashlib.sha256(str(shard_value).encode("utf-8")).hexdigest()
+        return f"{collection}/{name}"
+    
+    def _known_partitions(self, collection: str) -> set:
+        """Storage keys of a partitioned collection, discovered from disk on first use"""
+        keys = self._partition_keys.get(collection)
+        if keys is None:
+            self._migrate_unpartitioned(collection)
+            folder = self.data_dir / collection
+            keys = {f"{collection}/{path.stem}" for path in folder.glob("*.json")} if folder.exists() else set()
+            self._partition_keys[collection] = keys
+        return keys
+    
+    def _migrate_unpartitioned(self, collection: str):
+        """
+        Split a legacy single-file collection into partition files. Runs
+        synchronously, so no other request can interleave with it; the
+        original file is kept as <collection>.json.migrated.
+        """
+        legacy = self._get_file_path(collection)
+        if not legacy.exists():
+            return
+        with open(legacy, 'r', encoding='utf-8') as f:
+            documents = json.load(f)
+        shard_field = self.partitions[collection]
+        grouped: Dict[str, List[Dict]] = {}
+        for doc in documents:
+            grouped.setdefault(self._storage_key(collection, doc.get(shard_field)), []).append(doc)
+        for key, docs in grouped.items():
+            path = self._get_file_path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            existing = []
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    existing = json.load(f)
+            temp_path = path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(existing + docs, f, indent=2, default=str, ensure_ascii=False)
+            temp_path.replace(path)
+        legacy.replace(legacy.with_name(legacy.name + ".migrated"))
+        print(f"Migrated {len(documents)} {collection} documents into {len(grouped)} partitions")
+    
+    def _read_keys(self, collection: str, query: Optional[Dict] = None) -> List[str]:
+        """Storage keys a read has to visit: one partition if the query has the shard key"""
+        shard_field = self.partitions.get(collection)
+        if shard_field is None:
+            return [collection]
+        known = self._known_partitions(collection)
+        if query and shard_field in query and not is_operator(query[shard_field]):
+            key = self._storage_key(collection, query[shard_field])
+            return [key] if key in known else []
+        return sorted(known)
+    
+    def _write_key(self, collection: str, document: Dict) -> str:
+        shard_field = self.partitions.get(collection)
+        if shard_field is None:
+            return collection
+        key = self._storage_key(collection, document.get(shard_field))
+        self._known_partitions(collection).add(key)
+        return key
+    
+    async def _load_data(self, key: str, use_cache: bool = True) -> List[Dict]:
         # Check cache first (outside lock for performance)
-        if use_cache and collection in self._cache:
-            return copy.deepcopy(self._cache[collection])
+        if use_cache and key in self._cache:
+            return self._copy_cached(key)
         
-        # Use collection-specific lock
-        async with self._get_lock(collection):
+        # Use per-file lock
+        async with timed_lock(self._get_lock(key)):
             # Double-check cache after acquiring lock
-            if use_cache and collection in self._cache:
-                return copy.deepcopy(self._cache[collection])
+            if use_cache and key in self._cache:
+                return self._copy_cached(key)
             
-            if not file_path.exists():
-                self._cache[collection] = []
-                return []
-            
-            try:
-                # Use synchronous file I/O directly (FastAPI handles async context)
+            return self._read_file(key)
+    
+    def _copy_cached(self, key: str) -> List[Dict]:
+        """Independent copies of a storage key's cached documents"""
+        cached = self._cache[key]
+        if isinstance(cached, list):
+            with phase("deepcopy"):
+                return copy.deepcopy(cached)
+        # A columnar table builds fresh documents
+        with phase("columnar_rows"):
+            return list(cached)
+    
+    async def _load_collection(self, collection: str, query: Optional[Dict] = None) -> List[Dict]:
+        """Documents of every partition the query can match, loaded concurrently"""
+        keys = self._read_keys(collection, query)
+        if len(keys) == 1:
+            return await self._load_data(keys[0])
+        parts = await asyncio.gather(*(self._load_data(key) for key in keys))
+        return [doc for part in parts for doc in part]
+    
+    async def _snapshot(self, key: str) -> Sequence[Dict]:
+        """
+        The cached list or columnar table itself (read-only): writers replace
+        it rather than mutating it
+        """
+        if key not in self._cache:
+            await self._load_data(key)
+        return self._cache[key]
+    
+    async def _snapshots(self, collection: str, query: Optional[Dict] = None) -> List[tuple]:
+        """(storage key, snapshot) for every partition the query can match, loaded concurrently"""
+        keys = self._read_keys(collection, query)
+        return list(zip(keys, await asyncio.gather(*(self._snapshot(key) for key in keys))))
+    
+    def _is_columnar(self, key: str) -> bool:
+        return key.split("/", 1)[0] in self.columnar
+    
+    def _cache_rows(self, key: str, rows: List[Dict]):
+        """Cache a storage key's documents; the cache never shares objects with rows"""
+        if self._is_columnar(key):
+            # Imported on first use so cold starts don't load NumPy
+            from app.storage.columnar import ColumnarTable
+            with phase("columnar_build"):
+                self._cache[key] = ColumnarTable(rows)
+        else:
+            with phase("deepcopy"):
+                self._cache[key] = copy.deepcopy(rows)
+    
+    def _table(self, key: str):
+        """The ColumnarTable cached for a storage key of a columnar collection"""
+        cached = self._cache[key]
+        if isinstance(cached, list):
+            self._cache_rows(key, cached)
+        return self._cache[key]
+    
+    def _read_file(self, key: str) -> List[Dict]:
+        """Load a file from disk into the cache; caller must hold its lock"""
+        file_path = self._get_file_path(key)
+        
+        if not file_path.exists():
+            self._cache[key] = []
+            return []
+        
+        try:
+            # Use synchronous file I/O directly (FastAPI handles async context)
+            with phase("json_load"):
                 with open(file_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                self._cache[collection] = data
-                return copy.deepcopy(data)
-            except Exception as e:
-                print(f"Error loading {collection}: {e}")
-                import traceback
-                traceback.print_exc()
-                self._cache[collection] = []
-                return []
-    
-    async def _save_data(self, collection: str, data: List[Dict]):
-        file_path = self._get_file_path(collection)
+            self._cache_rows(key, data)
+            return data
+        except Exception as e:
+            print(f"Error loading {key}: {e}")
+            import traceback
+            traceback.print_exc()
+            self._cache[key] = []
+            return []
+    
+    async def _save_data(self, key: str, data: List[Dict]):
+        file_path = self._get_file_path(key)
         temp_path = file_path.with_suffix('.tmp')
         
         try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
             # Use synchronous file I/O directly (FastAPI handles async context)
             # Write to temp file first
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, default=str, ensure_ascii=False)
-            
-            # Atomic rename (replace existing file)
-            if file_path.exists():
-                file_path.unlink()
-            temp_path.replace(file_path)
+            with phase("save"):
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, default=str, ensure_ascii=False)
+                
+                # Atomic rename (replace existing file)
+                if file_path.exists():
+                    file_path.unlink()
+                temp_path.replace(file_path)
             
             # Update cache after successful write
-            self._cache[collection] = copy.deepcopy(data)
+            self._cache_rows(key, data)
+            self._dirty.add(key)
         except Exception as e:
-            print(f"Error saving {collection}: {e}")
+            print(f"Error saving {key}: {e}")
             import traceback
             traceback.print_exc()
             if temp_path.exists():
@@ -80,135 +254,356 @@ class JSONRepository:
                     pass
             raise
     
-    async def insert_one(self, collection: str, document: Dict) -> Dict:
-        async with self._get_lock(collection):
-            # Load fresh data (bypass cache when modifying)
-            data = await self._load_data(collection, use_cache=False)
-            
-            # Generate ID if not present
-            if "_id" not in document:
-                document["_id"] = str(uuid.uuid4())
+    def sidecar_path(self, name: str) -> Path:
+        """Location of a snapshot sidecar; storage keys and derived indexes share the folder"""
+        return self.data_dir / ".snapshots" / f"{name}.pickle"
+    
+    def collection_checksum(self, collection: str) -> str:
+        """Checksum over every file of a collection, for validating derived sidecars"""
+        digest = hashlib.sha256()
+        for key in self._read_keys(collection):
+            file_path = self._get_file_path(key)
+            if file_path.exists():
+                digest.update(f"{key}:{file_checksum(file_path)};".encode("utf-8"))
+        return digest.hexdigest()
+    
+    async def preload(self, collections: Iterable[str]) -> Dict[str, str]:
+        """
+        Load collections, and the columnar tables of columnar ones, into memory
+        before the first request. Each storage key comes from its sidecar
+        snapshot when that matches the JSON file's checksum; otherwise the JSON
+        is parsed and a fresh sidecar written. Returns key -> source.
+        """
+        sources = {}
+        for collection in collections:
+            for key in self._read_keys(collection):
+                async with timed_lock(self._get_lock(key)):
+                    sources[key] = self._preload_key(collection, key)
+        return sources
+    
+    def _preload_key(self, collection: str, key: str) -> str:
+        file_path = self._get_file_path(key)
+        if not file_path.exists():
+            self._cache[key] = []
+            return "empty"
+        
+        checksum = file_checksum(file_path)
+        snapshot = read_snapshot(self.sidecar_path(key), checksum)
+        if snapshot is not None:
+            self._cache[key] = snapshot
+            if collection in self.columnar:
+                self._table(key)
+            return "snapshot"
+        
+        self._read_file(key)
+        self._write_snapshot(collection, key, checksum)
+        return "parsed"
+    
+    def _write_snapshot(self, collection: str, key: str, checksum: str):
+        try:
+            write_snapshot(self.sidecar_path(key), checksum, self._cache[key])
+            self._dirty.discard(key)
+        except Exception as e:
+            print(f"Error writing snapshot for {key}: {e}")
+    
+    def save_snapshots(self, collections: Iterable[str]) -> int:
+        """Refresh the sidecars of loaded storage keys written since their last snapshot"""
+        written = 0
+        for collection in collections:
+            for key in self._read_keys(collection):
+                file_path = self._get_file_path(key)
+                if key in self._dirty and key in self._cache and file_path.exists():
+                    self._write_snapshot(collection, key, file_checksum(file_path))
+                    written += 1
+        return written
+    
+    async def _lock_partitions(self, stack: AsyncExitStack, collections: Iterable[str], held: set):
+        """Hold the locks of every storage key of the collections, including partitions created meanwhile"""
+        while True:
+            keys = sorted({key for collection in collections for key in self._read_keys(collection)} - held)
+            if not keys:
+                return
+            for key in keys:
+                await stack.enter_async_context(timed_lock(self._get_lock(key)))
+                held.add(key)
+    
+    async def snapshot(self, collections: Iterable[str]) -> Dict[str, Any]:
+        """
+        Consistent point-in-time view of several collections. All their locks
+        are held only long enough to take references to the cached lists,
+        which writers replace rather than mutate, so the returned lists stay
+        valid and unchanged while they are copied out without any lock.
+        """
+        collections = list(collections)
+        async with self._multi_lock, AsyncExitStack() as stack:
+            await self._lock_partitions(stack, collections, set())
+            snapshot = {"versions": {}, "collections": {}}
+            for collection in collections:
+                parts = []
+                for key in self._read_keys(collection):
+                    if key not in self._cache:
+                        self._read_file(key)
+                    parts.append(self._cache[key])
+                snapshot["collections"][collection] = parts
+                snapshot["versions"][collection] = self.get_version(collection)
+            return snapshot
+    
+    async def restore(self, collections: Dict[str, List[Dict]]):
+        """
+        Replace collections wholesale, repartitioning by the current settings.
+        Every document is validated before anything is written. Listeners see a
+        delete for every document that disappeared and an update for every
+        document now stored, so derived indexes and versions stay in sync even
+        if a write fails part way.
+        """
+        grouped_by_collection: Dict[str, Dict[str, List[Dict]]] = {}
+        for collection, documents in collections.items():
+            grouped: Dict[str, List[Dict]] = {}
+            for doc in documents:
+                if not isinstance(doc, dict) or "_id" not in doc:
+                    raise ValueError(f"Every {collection} document must be an object with an _id")
+                shard_field = self.partitions.get(collection)
+                key = collection if shard_field is None else self._storage_key(collection, doc.get(shard_field))
+                grouped.setdefault(key, []).append(doc)
+            if collection not in self.partitions:
+                grouped.setdefault(collection, [])
+            grouped_by_collection[collection] = grouped
+        
+        async with self._multi_lock, AsyncExitStack() as stack:
+            held = set()
+            await self._lock_partitions(stack, collections, held)
+            for grouped in grouped_by_collection.values():
+                for key in sorted(grouped.keys() - held):
+                    await stack.enter_async_context(timed_lock(self._get_lock(key)))
+                    held.add(key)
             
-            # Add timestamps
-            if "created_at" not in document:
-                document["created_at"] = datetime.utcnow().isoformat()
-            if "updated_at" not in document:
-                document["updated_at"] = datetime.utcnow().isoformat()
+            previous = {}
+            for collection in collections:
+                previous[collection] = [
+                    doc
+                    for key in self._read_keys(collection)
+                    for doc in (self._cache[key] if key in self._cache else self._read_file(key))
+                ]
             
+            written = []
+            try:
+                for collection, grouped in grouped_by_collection.items():
+                    written.append(collection)
+                    for key, rows in grouped.items():
+                        if collection in self.partitions:
+                            self._known_partitions(collection).add(key)
+                        await self._save_data(key, rows)
+                    # Partitions absent from the backup are removed
+                    for key in set(self._read_keys(collection)) - grouped.keys():
+                        self._get_file_path(key).unlink(missing_ok=True)
+                        self._cache.pop(key, None)
+                        self._partition_keys[collection].discard(key)
+            finally:
+                # Report what is actually stored now, including after a partial failure
+                for collection in written:
+                    current = [
+                        doc
+                        for key in self._read_keys(collection)
+                        for doc in (self._cache[key] if key in self._cache else self._read_file(key))
+                    ]
+                    current_ids = {doc.get("_id") for doc in current}
+                    for doc in previous[collection]:
+                        if doc.get("_id") not in current_ids:
+                            self._notify(collection, "delete", doc)
+                    for doc in current:
+                        self._notify(collection, "update", doc)
+    
+    async def insert_one(self, collection: str, document: Dict) -> Dict:
+        # Generate ID if not present
+        if "_id" not in document:
+            document["_id"] = str(uuid.uuid4())
+        
+        # Add timestamps
+        if "created_at" not in document:
+            document["created_at"] = datetime.utcnow().isoformat()
+        if "updated_at" not in document:
+            document["updated_at"] = datetime.utcnow().isoformat()
+        
+        key = self._write_key(collection, document)
+        async with timed_lock(self._get_lock(key)):
+            # Load fresh data (bypass cache when modifying; the lock is already held)
+            data = self._read_file(key)
             data.append(document)
-            await self._save_data(collection, data)
+            await self._save_data(key, data)
+            self._notify(collection, "insert", document)
             
             return {"inserted_id": document["_id"]}
     
     async def find(self, collection: str, query: Optional[Dict] = None) -> List[Dict]:
+        if query and collection in self.columnar:
+            # Filter vectorized and build only the matches
+            results = []
+            for key, _ in await self._snapshots(collection, query):
+                table = self._table(key)
+                with phase("columnar_filter"):
+                    indices = table.filter(query)
+                with phase("columnar_rows"):
+                    results.extend(table.take(indices))
+            return results
+        
         # Load data (will use lock internally if needed)
-        data = await self._load_data(collection)
+        data = await self._load_collection(collection, query)
         
         if not query:
-            return copy.deepcopy(data)
+            with phase("deepcopy"):
+                return copy.deepcopy(data)
         
         # Simple query matching
         results = []
         for doc in data:
-            match = True
-            for key, value in query.items():
-                # Handle string ID comparison
-                if key == "_id" and isinstance(value, str):
-                    if doc.get(key) != value:
-                        match = False
-                        break
-                elif key not in doc or doc[key] != value:
-                    match = False
-                    break
-            if match:
-                results.append(copy.deepcopy(doc))
+            if matches(doc, query):
+                with phase("deepcopy"):
+                    results.append(copy.deepcopy(doc))
         
         return results
     
+    async def iter_find(self, collection: str, query: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        """Yield copies of matching documents one at a time without materializing the result"""
+        for key in self._read_keys(collection, query):
+            # Writers replace the cached list instead of mutating it, so this is a stable snapshot
+            data = await self._snapshot(key)
+            
+            for doc in data:
+                if matches(doc, query):
+                    # Columnar tables already hand out fresh documents
+                    yield copy.deepcopy(doc) if isinstance(data, list) else doc
+    
     async def find_one(self, collection: str, query: Dict) -> Optional[Dict]:
         results = await self.find(collection, query)
         return results[0] if results else None
     
+    async def _owning_keys(self, collection: str, query: Dict) -> AsyncIterator[str]:
+        """
+        Storage keys a single-document write has to lock and re-read. Without
+        the shard key, the cached snapshots tell which partitions hold a match,
+        so the others are neither parsed nor have their columnar tables
+        discarded; they are scanned again if the document moved meanwhile.
+        """
+        keys = self._read_keys(collection, query)
+        if len(keys) <= 1:
+            for key in keys:
+                yield key
+            return
+        while True:
+            owners = []
+            for key, rows in await self._snapshots(collection, query):
+                if collection in self.columnar:
+                    found = self._table(key).filter(query).size > 0
+                else:
+                    found = any(matches(doc, query) for doc in rows)
+                if found:
+                    owners.append(key)
+            if not owners:
+                return
+            for key in owners:
+                yield key
+    
     async def update_one(self, collection: str, query: Dict, update: Dict) -> Dict:
-        async with self._get_lock(collection):
-            # Load fresh data (bypass cache when modifying)
-            data = await self._load_data(collection, use_cache=False)
-            
-            modified_count = 0
-            matched_count = 0
-            
-            for i, doc in enumerate(data):
-                match = True
-                for key, value in query.items():
-                    # Handle string ID comparison
-                    if key == "_id" and isinstance(value, str):
-                        if doc.get(key) != value:
-                            match = False
-                            break
-                    elif key not in doc or doc[key] != value:
-                        match = False
-                        break
+        shard_field = self.partitions.get(collection)
+        new_shard = update.get("$set", {})
+        async for key in self._owning_keys(collection, query):
+            # Setting the shard field moves the document: lock both partitions, in
+            # key order so two opposite moves cannot deadlock
+            new_key = key
+            if shard_field is not None and shard_field in new_shard:
+                new_key = self._storage_key(collection, new_shard[shard_field])
+            async with AsyncExitStack() as stack:
+                for lock_key in sorted({key, new_key}):
+                    await stack.enter_async_context(timed_lock(self._get_lock(lock_key)))
+                # Load fresh data (bypass cache when modifying; the lock is already held)
+                data = self._read_file(key)
                 
-                if match:
-                    matched_count += 1
-                    # Apply $set operator
-                    if "$set" in update:
-                        for key, value in update["$set"].items():
-                            data[i][key] = value
-                        data[i]["updated_at"] = datetime.utcnow().isoformat()
-                        modified_count += 1
-                    break
-            
-            if modified_count > 0:
-                await self._save_data(collection, data)
-            
-            return {
-                "matched_count": matched_count,
-                "modified_count": modified_count
-            }
+                index = next((i for i, doc in enumerate(data) if matches(doc, query)), None)
+                if index is None:
+                    continue
+                
+                # Apply $set operator
+                if "$set" not in update:
+                    return {"matched_count": 1, "modified_count": 0}
+                updated = data[index]
+                for field, value in update["$set"].items():
+                    updated[field] = value
+                updated["updated_at"] = datetime.utcnow().isoformat()
+                
+                if new_key != key:
+                    # Destination first: a failure part way leaves the document
+                    # stored twice rather than lost, and a retry replaces the copy
+                    self._write_key(collection, updated)
+                    target = [doc for doc in self._read_file(new_key) if doc.get("_id") != updated.get("_id")]
+                    target.append(updated)
+                    await self._save_data(new_key, target)
+                    data.pop(index)
+                await self._save_data(key, data)
+                self._notify(collection, "update", updated)
+                return {"matched_count": 1, "modified_count": 1}
+        
+        return {"matched_count": 0, "modified_count": 0}
     
     async def delete_one(self, collection: str, query: Dict) -> Dict:
-        async with self._get_lock(collection):
-            # Load fresh data (bypass cache when modifying)
-            data = await self._load_data(collection, use_cache=False)
-            
-            deleted_count = 0
-            for i, doc in enumerate(data):
-                match = True
-                for key, value in query.items():
-                    # Handle string ID comparison
-                    if key == "_id" and isinstance(value, str):
-                        if doc.get(key) != value:
-                            match = False
-                            break
-                    elif key not in doc or doc[key] != value:
-                        match = False
-                        break
+        async for key in self._owning_keys(collection, query):
+            async with timed_lock(self._get_lock(key)):
+                # Load fresh data (bypass cache when modifying; the lock is already held)
+                data = self._read_file(key)
                 
-                if match:
-                    data.pop(i)
-                    deleted_count += 1
-                    break
-            
-            if deleted_count > 0:
-                await self._save_data(collection, data)
-            
-            return {"deleted_count": deleted_count}
+                index = next((i for i, doc in enumerate(data) if matches(doc, query)), None)
+                if index is None:
+                    continue
+                
+                deleted = data.pop(index)
+                await self._save_data(key, data)
+                self._notify(collection, "delete", deleted)
+                return {"deleted_count": 1}
+        
+        return {"deleted_count": 0}
+    
+    async def count_documents(self, collection: str, query: Optional[Dict] = None) -> int:
+        """Count matching documents without copying them"""
+        total = 0
+        for key, rows in await self._snapshots(collection, query):
+            if collection in self.columnar:
+                total += self._table(key).count(query)
+            else:
+                total += sum(1 for doc in rows if matches(doc, query))
+        return total
     
     async def distinct(self, collection: str, field: str) -> List[Any]:
         """Get distinct values for a field"""
-        data = await self._load_data(collection)
+        if collection in self.columnar:
+            distinct_values = set()
+            for key, _ in await self._snapshots(collection):
+                distinct_values.update(self._table(key).distinct(field))
+            return sorted(distinct_values)
+        
+        data = await self._load_collection(collection)
         distinct_values = set()
         for doc in data:
             if field in doc:
                 distinct_values.add(doc[field])
         return sorted(list(distinct_values))
 
+def parse_partitions(spec: str) -> Dict[str, str]:
+    """Parse "videos:pet_id,pets:_id" into {"videos": "pet_id", "pets": "_id"}"""
+    partitions = {}
+    for item in spec.split(","):
+        collection, _, field = item.strip().partition(":")
+        if collection and field:
+            partitions[collection.strip()] = field.strip()
+    return partitions
+
 # Global repository instance
 _repository = None
 
 def get_repository() -> JSONRepository:
     global _repository
     if _repository is None:
-        _repository = JSONRepository()
+        from app.config import settings
+        _repository = JSONRepository(
+            partitions=parse_partitions(settings.partitioned_collections),
+            columnar=[name.strip() for name in settings.columnar_collections.split(",") if name.strip()]
+        )
     return _repository
@@ -0,0 +1,37 @@
+import operator
+from typing import Any, Dict, Optional
+
+MISSING = object()
+
+# Mongo-style comparison operators, e.g. {"price": {"$gte": 500, "$lt": 1000}}
+RANGE_OPERATORS = {
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le
+}
+
+def is_operator(condition: Any) -> bool:
+    return isinstance(condition, dict) and bool(condition) and all(str(key).startswith("$") for key in condition)
+
+def match_value(value: Any, condition: Any) -> bool:
+    """Match one field value (MISSING if absent) against an equality or range condition"""
+    if value is MISSING:
+        return False
+    if not is_operator(condition):
+        return value == condition
+    for op, bound in condition.items():
+        compare = RANGE_OPERATORS.get(op)
+        if compare is None:
+            raise ValueError(f"Unsupported query operator: {op}")
+        try:
+            if not compare(value, bound):
+                return False
+        except TypeError:
+            return False
+    return True
+
+def matches(doc: Dict, query: Optional[Dict]) -> bool:
+    if not query:
+        return True
+    return all(match_value(doc.get(key, MISSING), condition) for key, condition in query.items())
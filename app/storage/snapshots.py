@@ -0,0 +1,66 @@
+import hashlib
+import pickle
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+# Bump when the layout of snapshot files or of pickled index classes changes
+SNAPSHOT_FORMAT = 2
+CHUNK_SIZE = 1024 * 1024
+
+# Modules defining the classes pickled into snapshots; any edit to them invalidates old snapshots
+_APP_DIR = Path(__file__).resolve().parents[1]
+SNAPSHOT_SOURCES = (
+    _APP_DIR / "storage" / "snapshots.py",
+    _APP_DIR / "storage" / "columnar.py",
+    _APP_DIR / "services" / "product_search.py"
+)
+
+@lru_cache(maxsize=None)
+def code_fingerprint() -> str:
+    """Hash of the snapshot source modules, as a safety net for a forgotten SNAPSHOT_FORMAT bump"""
+    digest = hashlib.sha256()
+    for path in SNAPSHOT_SOURCES:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+def file_checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def write_snapshot(path: Path, checksum: str, payload: Any):
+    """
+    Write a sidecar holding payload derived from source data with this
+    checksum. A small header goes first so stale snapshots, including ones
+    written by another version of the pickled classes' code, are rejected
+    without unpickling the body. Objects in one payload keep their shared
+    references (e.g. strings shared by the rows of a columnar table).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "wb") as f:
+        header = {"format": SNAPSHOT_FORMAT, "code": code_fingerprint(), "checksum": checksum}
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    temp_path.replace(path)
+
+def read_snapshot(path: Path, checksum: str) -> Optional[Any]:
+    """Load a sidecar's payload if this code wrote it, in this format, from a source with this checksum"""
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            header = pickle.load(f)
+            if (
+                header.get("format") != SNAPSHOT_FORMAT
+                or header.get("code") != code_fingerprint()
+                or header.get("checksum") != checksum
+            ):
+                return None
+            return pickle.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable snapshot {path}: {e}")
+        return None
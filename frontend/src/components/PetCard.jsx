@@ -20,11 +20,17 @@ export default function PetCard({ pet, onDelete }) {
       <div className="bg-white rounded-xl shadow-md hover:shadow-xl transition cursor-pointer overflow-hidden group relative">
         <div className="relative h-48 bg-gradient-to-br from-blue-400 to-purple-500">
           {pet.image ? (
-            <img 
-              src={pet.image} 
-              alt={pet.name}
-              className="w-full h-full object-cover group-hover:scale-110 transition duration-300"
-            />
+            <picture className="block w-full h-full">
+              {pet.images?.card?.webp && (
+                <source srcSet={pet.images.card.webp} type="image/webp" />
+              )}
+              <img 
+                src={pet.images?.card?.jpeg || pet.image} 
+                alt={pet.name}
+                loading="lazy"
+                className="w-full h-full object-cover group-hover:scale-110 transition duration-300"
+              />
+            </picture>
           ) : (
             <div className="w-full h-full flex items-center justify-center text-white text-6xl font-bold">
               {pet.name?.[0] || '?'}
@@ -8,8 +8,20 @@ export default function PetProfile({ pet, onUpdate }) {
       <div className="bg-white rounded-xl shadow-lg p-6">
         {/* Header */}
         <div className="flex items-start gap-6 mb-6">
-          <img src={pet.image} alt={pet.name} 
-               className="w-32 h-32 rounded-full object-cover" />
+          {/* 128px avatar: the 160px thumb at 1x, the 480px card on high-DPI screens */}
+          <picture className="block w-32 h-32 shrink-0">
+            {pet.images?.thumb?.webp && pet.images?.card?.webp && (
+              <source srcSet={`${pet.images.thumb.webp} 160w, ${pet.images.card.webp} 480w`}
+                      sizes="128px" type="image/webp" />
+            )}
+            <img src={pet.images?.card?.jpeg || pet.image}
+                 srcSet={pet.images?.thumb?.jpeg && pet.images?.card?.jpeg
+                   ? `${pet.images.thumb.jpeg} 160w, ${pet.images.card.jpeg} 480w`
+                   : undefined}
+                 sizes="128px"
+                 alt={pet.name}
+                 className="w-32 h-32 rounded-full object-cover" />
+          </picture>
           <div className="flex-1">
             <h1 className="text-3xl font-bold">{pet.name}</h1>
             <p className="text-gray-600">{pet.breed} • {pet.age} years old</p>
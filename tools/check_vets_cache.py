@@ -0,0 +1,207 @@
+"""
+Behaviour check of the nearby-vets caching against the local Places stand-in.
+
+Exercises TTLCache directly (fresh hits, expiry, stale-while-revalidate,
+coalescing, failed fetches) and then GET /api/vets/nearby through the app
+with tools.stub_places as upstream, counting upstream calls via its /stats.
+Runs in a scratch directory, so the clinic index and caches start empty.
+
+Usage:
+    python -m tools.check_vets_cache
+    python -m tools.check_vets_cache --latency 0.5
+Exits 1 if any check fails.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from tools.loadtest import ROOT, _free_port, _wait_for
+
+# Short lifetimes so expiry can be observed; set before the app reads its settings
+CACHE_TTL = 1.0
+CACHE_STALE_TTL = 2.0
+# Points inside one geohash cell (precision 6) around central London
+LAT, LNG = 51.5074, -0.1278
+RADIUS = 2000
+
+
+class Checks:
+    def __init__(self):
+        self.failures = 0
+
+    def expect(self, condition: bool, description: str, detail: str = ""):
+        print(f"{'ok  ' if condition else 'FAIL'} {description}{f' ({detail})' if detail and not condition else ''}")
+        if not condition:
+            self.failures += 1
+
+
+async def check_ttl_cache(checks: Checks):
+    from app.services.geo_cache import TTLCache
+
+    calls = []
+
+    def fetcher(value, delay=0.05):
+        async def fetch():
+            calls.append(value)
+            await asyncio.sleep(delay)
+            return value
+        return fetch
+
+    cache = TTLCache(ttl=0.2, stale_ttl=0.3, max_entries=2)
+    results = await asyncio.gather(*(cache.get_or_fetch("a", fetcher("v1")) for _ in range(10)))
+    checks.expect(results == ["v1"] * 10 and calls == ["v1"], "concurrent misses share one fetch", f"{len(calls)} fetches")
+    checks.expect(cache.stats["coalesced"] == 9, "coalesced waiters are counted", str(cache.stats))
+
+    checks.expect(await cache.get_or_fetch("a", fetcher("v2")) == "v1" and len(calls) == 1, "fresh entry served without fetching")
+
+    await asyncio.sleep(0.25)
+    started = time.perf_counter()
+    value = await cache.get_or_fetch("a", fetcher("v2", delay=0.1))
+    checks.expect(value == "v1" and time.perf_counter() - started < 0.05, "stale entry served immediately")
+    await asyncio.gather(*(cache.get_or_fetch("a", fetcher("v3", delay=0.1)) for _ in range(5)))
+    await asyncio.sleep(0.15)
+    checks.expect(calls == ["v1", "v2"], "one background refresh per stale key", str(calls))
+    checks.expect(await cache.get_or_fetch("a", fetcher("v4")) == "v2", "refreshed value replaces the stale one")
+
+    await asyncio.sleep(0.55)
+    checks.expect(await cache.get_or_fetch("a", fetcher("v5")) == "v5", "entry past ttl + stale_ttl is fetched again")
+
+    async def failing():
+        calls.append("error")
+        raise RuntimeError("upstream down")
+
+    try:
+        await cache.get_or_fetch("b", failing)
+        checks.expect(False, "failed fetch raises to the caller")
+    except RuntimeError:
+        checks.expect(cache.peek("b") is None, "failed fetch is not cached")
+    checks.expect(await cache.get_or_fetch("b", fetcher("b1")) == "b1", "key is fetched again after a failure")
+
+    await cache.get_or_fetch("c", fetcher("c1"))
+    checks.expect(cache.peek("a") is None and cache.peek("c") == "c1", "least recently used entry is evicted at max_entries")
+
+async def check_nearby_vets(checks: Checks, stub_url: str, latency: float):
+    from app.config import settings
+    from app.main import app
+    from app.routes import vets
+    from app.services.http_client import close_http_client
+
+    async def upstream_calls(stub: httpx.AsyncClient) -> int:
+        return (await stub.get("/stats")).json()["nearby"]
+
+    async def nearby(api: httpx.AsyncClient, lat: float = LAT, lng: float = LNG, radius: int = RADIUS):
+        response = await api.get("/api/vets/nearby", params={"lat": lat, "lng": lng, "radius": radius})
+        return response.status_code, response.json()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as api, \
+            httpx.AsyncClient(base_url=stub_url) as stub:
+        # The clinic index would answer repeated areas itself; checked separately below
+        settings.vets_index_max_age = 0
+
+        # Nudged positions inside one cell share a single upstream query
+        responses = await asyncio.gather(*(nearby(api, LAT + i * 1e-5, LNG) for i in range(20)))
+        checks.expect(all(status == 200 for status, _ in responses), "nearby searches succeed through the stub")
+        checks.expect(await upstream_calls(stub) == 1, "concurrent searches in one cell make one upstream call",
+                      f"{await upstream_calls(stub)} calls")
+        vets_found = responses[0][1]["vets"]
+        distances = [vet["distance"] for vet in vets_found]
+        checks.expect(bool(vets_found) and distances == sorted(distances) and max(distances) <= RADIUS,
+                      "results are within the radius, nearest first", f"{len(vets_found)} vets")
+        checks.expect(all("open_now" in vet for vet in vets_found), "upstream answers include open_now")
+
+        await nearby(api)
+        checks.expect(await upstream_calls(stub) == 1, "repeat search within the ttl is a cache hit")
+
+        await asyncio.sleep(CACHE_TTL + 0.1)
+        started = time.perf_counter()
+        status, body = await nearby(api)
+        elapsed = time.perf_counter() - started
+        checks.expect(status == 200 and elapsed < latency, "stale result served without waiting for upstream",
+                      f"{elapsed * 1000:.0f}ms")
+        await asyncio.sleep(latency + 0.2)
+        checks.expect(await upstream_calls(stub) == 2, "stale result refreshed once in the background",
+                      f"{await upstream_calls(stub)} calls")
+
+        await asyncio.sleep(CACHE_TTL + CACHE_STALE_TTL + 0.1)
+        started = time.perf_counter()
+        await nearby(api)
+        checks.expect(time.perf_counter() - started >= latency and await upstream_calls(stub) == 3,
+                      "expired result waits for a fresh upstream call")
+
+        # An untruncated upstream answer marks its circle as covered; repeats come from the clinic index
+        settings.vets_index_max_age = 3600
+        index_lat, index_lng = LAT + 0.1, LNG
+        _, body = await nearby(api, index_lat, index_lng, 500)
+        upstream_ids = [vet["id"] for vet in body["vets"]]
+        calls = await upstream_calls(stub)
+        status, body = await nearby(api, index_lat, index_lng, 500)
+        index_ids = [vet["id"] for vet in body["vets"]]
+        checks.expect(status == 200 and await upstream_calls(stub) == calls, "covered area answered from the index")
+        checks.expect(all("open_now" not in vet for vet in body["vets"]), "index answers omit open_now")
+        checks.expect(bool(upstream_ids) and sorted(index_ids) == sorted(upstream_ids), "index answer matches the upstream clinics",
+                      f"{index_ids} vs {upstream_ids}")
+
+        # Error statuses arrive as 200 and must not be cached or recorded as coverage
+        settings.vets_index_max_age = 0
+        settings.google_maps_api_key = "denied"
+        entries = len(vets.nearby_cache._entries)
+        status, body = await nearby(api, LAT + 1, LNG + 1)
+        checks.expect(status == 502, "REQUEST_DENIED from upstream is an error", f"{status} {body}")
+        checks.expect(len(vets.nearby_cache._entries) == entries, "failed search is not cached")
+        settings.vets_index_max_age = 3600
+        checks.expect(not vets._get_vet_index().covers(LAT + 1, LNG + 1, 100, 3600), "failed search records no coverage")
+
+        # Index changes are batched into one delayed save, flushed early on shutdown
+        index_path = vets._get_vet_index().path
+        checks.expect(not index_path.exists(), "index changes are not written on every fetch")
+        await vets.flush_vet_index()
+        checks.expect(index_path.exists() and str(upstream_ids[0]) in index_path.read_text(encoding="utf-8"),
+                      "flushing writes the pending index changes")
+
+    await close_http_client()
+
+def main():
+    parser = argparse.ArgumentParser(description="Check nearby-vets caching against the Places stand-in")
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub response latency in seconds")
+    args = parser.parse_args()
+
+    checks = Checks()
+    print("TTLCache")
+    asyncio.run(check_ttl_cache(checks))
+
+    print("GET /api/vets/nearby")
+    port = _free_port()
+    stub = subprocess.Popen([
+        sys.executable, "-m", "tools.stub_places", "--port", str(port), "--latency", str(args.latency)
+    ], cwd=ROOT, env={**os.environ, "PYTHONPATH": str(ROOT)})
+    try:
+        stub_url = f"http://127.0.0.1:{port}"
+        _wait_for(f"{stub_url}/stats")
+        os.environ.update({
+            "GOOGLE_MAPS_API_KEY": "stub",
+            "GOOGLE_PLACES_BASE_URL": f"{stub_url}/maps/api/place",
+            "VETS_CACHE_TTL": str(CACHE_TTL),
+            "VETS_CACHE_STALE_TTL": str(CACHE_STALE_TTL)
+        })
+        with tempfile.TemporaryDirectory(prefix="petcare-vets-check-") as tmp:
+            os.chdir(tmp)
+            try:
+                asyncio.run(check_nearby_vets(checks, stub_url, args.latency))
+            finally:
+                os.chdir(ROOT)
+    finally:
+        stub.terminate()
+        stub.wait(timeout=10)
+
+    print(f"{checks.failures} failed" if checks.failures else "all checks passed")
+    sys.exit(1 if checks.failures else 0)
+
+if __name__ == "__main__":
+    main()
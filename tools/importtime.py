@@ -0,0 +1,96 @@
+"""
+Import-time profile of the serverless entry point, for tracking cold starts.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+reports the total import time, the slowest top-level packages and any heavy
+dependencies that were loaded eagerly.
+
+Usage:
+    python -m tools.importtime                      # human-readable report
+    python -m tools.importtime --json               # machine-readable, for CI
+    python -m tools.importtime --budget-ms 800      # exit 1 if over budget
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Must only be imported when a request actually needs them
+LAZY_MODULES = ["cv2", "numpy", "openai", "PIL", "httpx"]
+
+def profile(module: str, runs: int = 1) -> dict:
+    """Profile importing module; with several runs the fastest is kept"""
+    best = None
+    for _ in range(runs):
+        env = {**os.environ, "PYTHONPATH": str(ROOT), "PYTHONDONTWRITEBYTECODE": "1"}
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+        entries = []
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            entries.append((name.rstrip(), int(self_us), int(cumulative_us)))
+
+        packages = defaultdict(int)
+        for name, self_us, _ in entries:
+            packages[name.strip().split(".")[0]] += self_us
+        total_us = sum(self_us for _, self_us, _ in entries)
+        loaded = {name.strip() for name, _, _ in entries}
+
+        result = {
+            "module": module,
+            "total_ms": round(total_us / 1000, 1),
+            "module_count": len(entries),
+            "packages": sorted(
+                ({"package": p, "ms": round(us / 1000, 1)} for p, us in packages.items()),
+                key=lambda item: -item["ms"]
+            ),
+            "eager_heavy_modules": [m for m in LAZY_MODULES if m in loaded]
+        }
+        if best is None or result["total_ms"] < best["total_ms"]:
+            best = result
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of the API entry point")
+    parser.add_argument("--module", default="api.index", help="Module to import (default: api.index)")
+    parser.add_argument("--runs", type=int, default=3, help="Repeat and keep the fastest run")
+    parser.add_argument("--top", type=int, default=15, help="Number of packages to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail if total import time exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = profile(args.module, args.runs)
+    report["packages"] = report["packages"][:args.top]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import {report['module']}: {report['total_ms']} ms across {report['module_count']} modules")
+        for item in report["packages"]:
+            print(f"  {item['ms']:>8.1f} ms  {item['package']}")
+        if report["eager_heavy_modules"]:
+            print(f"Heavy modules imported eagerly: {', '.join(report['eager_heavy_modules'])}")
+
+    failed = bool(report["eager_heavy_modules"])
+    if args.budget_ms is not None and report["total_ms"] > args.budget_ms:
+        print(f"Import time {report['total_ms']} ms exceeds budget of {args.budget_ms} ms", file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
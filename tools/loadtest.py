@@ -0,0 +1,383 @@
+"""
+End-to-end load test of the API against local OpenAI and Places stand-ins.
+
+Starts tools.stub_openai, tools.stub_places and a uvicorn worker running
+app.main in a scratch directory, seeds pets and products, then drives mixed
+scenarios with asyncio clients and reports throughput, per-route latency
+percentiles, error rates and worker RSS.
+
+Usage:
+    python -m tools.loadtest --concurrency 50 --duration 60
+    python -m tools.loadtest --mix crud=2,browse=6,video=1,vets=3 --pets 200 --products 2000 --json
+    python -m tools.loadtest --base-url http://127.0.0.1:8000   # existing server, no stubs or seeding
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CITIES = [(40.7128, -74.0060), (51.5074, -0.1278), (19.0760, 72.8777), (37.7749, -122.4194)]
+PRODUCT_WORDS = (
+    "chicken salmon grain free chew rope ball brush shampoo orthopedic memory foam "
+    "vitamin joint omega scratch tower catnip leash harness dental treat kibble"
+).split()
+CATEGORIES = ["food", "toys", "grooming", "beds", "health", "accessories"]
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def _rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+class Recorder:
+    """Collects latency samples and failures per route"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.error_samples: Dict[str, str] = {}
+
+    async def call(self, client: httpx.AsyncClient, route: str, method: str, url: str, ok=(200,), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.latencies[route].append(time.perf_counter() - started)
+            self.errors[route] += 1
+            self.error_samples.setdefault(route, f"{type(e).__name__}: {e}")
+            return None
+        self.latencies[route].append(time.perf_counter() - started)
+        if response.status_code not in ok:
+            self.errors[route] += 1
+            self.error_samples.setdefault(route, f"HTTP {response.status_code}: {response.text[:200]}")
+            return None
+        return response
+
+    def report(self, elapsed: float) -> Dict:
+        routes = {}
+        total = 0
+        for route, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            total += len(samples)
+            routes[route] = {
+                "requests": len(samples),
+                "errors": self.errors[route],
+                "error_rate": round(self.errors[route] / len(samples), 4),
+                "rps": round(len(samples) / elapsed, 1),
+                "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+                "p95_ms": round(_percentile(ordered, 95) * 1000, 1),
+                "p99_ms": round(_percentile(ordered, 99) * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1)
+            }
+        return {
+            "elapsed_s": round(elapsed, 1),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+            "routes": routes,
+            "error_samples": self.error_samples
+        }
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, video: Optional[bytes]):
+        self.client = client
+        self.recorder = recorder
+        self.video = video
+        self.pet_ids: List[str] = []
+        self.place_ids: List[str] = []
+        self.deadline = float("inf")
+
+    async def call(self, route: str, method: str, url: str, **kwargs):
+        return await self.recorder.call(self.client, route, method, url, **kwargs)
+
+    async def seed_pets(self, count: int):
+        for i in range(count):
+            response = await self.call("POST /api/pets", "POST", "/api/pets", json={
+                "name": f"Pet {i}",
+                "species": random.choice(["dog", "cat"]),
+                "breed": "Mixed",
+                "age": random.randint(1, 15),
+                "gender": random.choice(["male", "female"])
+            })
+            if response is not None:
+                self.pet_ids.append(response.json()["id"])
+
+    async def scenario_crud(self):
+        response = await self.call("POST /api/pets", "POST", "/api/pets", json={
+            "name": "Load Test Pet", "species": "dog", "breed": "Beagle", "gender": "female"
+        })
+        if response is None:
+            return
+        pet_id = response.json()["id"]
+        await self.call("GET /api/pets/{pet_id}", "GET", f"/api/pets/{pet_id}")
+        await self.call("PUT /api/pets/{pet_id}", "PUT", f"/api/pets/{pet_id}", json={"weight": random.uniform(5, 40)})
+        await self.call("GET /api/pets", "GET", "/api/pets")
+        await self.call("GET /api/pets/summary", "GET", "/api/pets/summary")
+        await self.call("DELETE /api/pets/{pet_id}", "DELETE", f"/api/pets/{pet_id}")
+
+    async def scenario_browse(self):
+        await self.call("GET /api/shop/categories", "GET", "/api/shop/categories")
+        await self.call("GET /api/shop/products", "GET", "/api/shop/products",
+                        params={"category": random.choice(CATEGORIES)})
+        query = " ".join(random.sample(PRODUCT_WORDS, 2))
+        # Typeahead: progressively longer prefixes of the last word
+        for end in range(len(query) - 2, len(query) + 1):
+            await self.call("GET /api/shop/search", "GET", "/api/shop/search", params={"q": query[:end]})
+        await self.call("GET /api/shop/search", "GET", "/api/shop/search",
+                        params={"species": random.choice(["dog", "cat"]), "max_price": 2500})
+
+    async def scenario_video(self):
+        if not self.pet_ids or self.video is None:
+            return
+        pet_id = random.choice(self.pet_ids)
+        response = await self.call(
+            "POST /api/videos/upload/{pet_id}", "POST", f"/api/videos/upload/{pet_id}",
+            files={"file": ("clip.mp4", self.video, "video/mp4")}
+        )
+        if response is None:
+            return
+        video_id = response.json()["video_id"]
+        # Poll until analysis finishes, but never past the end of the run
+        deadline = min(time.monotonic() + 60, self.deadline)
+        while time.monotonic() < deadline:
+            result = await self.call("GET /api/videos/{video_id}", "GET", f"/api/videos/{video_id}")
+            if result is None or result.json().get("analysis_status") in ("completed", "failed"):
+                break
+            await asyncio.sleep(0.5)
+        await self.call("GET /api/videos/pet/{pet_id}/videos", "GET", f"/api/videos/pet/{pet_id}/videos")
+
+    async def scenario_vets(self):
+        lat, lng = random.choice(CITIES)
+        lat += random.uniform(-0.05, 0.05)
+        lng += random.uniform(-0.05, 0.05)
+        response = await self.call("GET /api/vets/nearby", "GET", "/api/vets/nearby", params={
+            "lat": lat, "lng": lng, "radius": random.choice([1000, 2000, 5000])
+        })
+        if response is not None:
+            self.place_ids.extend(v["id"] for v in response.json().get("vets", [])[:3])
+        if self.place_ids:
+            place_id = random.choice(self.place_ids)
+            await self.call("GET /api/vets/{place_id}/details", "GET", f"/api/vets/{place_id}/details")
+
+
+def _make_video(seconds: int = 2) -> Optional[bytes]:
+    """Synthetic clip of a moving square, or None if OpenCV is unavailable"""
+    try:
+        import cv2
+        import numpy as np
+    except ImportError:
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "clip.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 15, (320, 240))
+        for i in range(seconds * 15):
+            frame = np.full((240, 320, 3), 40, np.uint8)
+            x = (i * 7) % 280
+            cv2.rectangle(frame, (x, 100), (x + 40, 140), (0, 200, 255), -1)
+            writer.write(frame)
+        writer.release()
+        with open(path, "rb") as f:
+            return f.read()
+
+def _seed_products(data_dir: Path, count: int):
+    products = []
+    for i in range(count):
+        products.append({
+            "_id": f"product-{i}",
+            "name": " ".join(random.sample(PRODUCT_WORDS, 3)).title(),
+            "description": " ".join(random.sample(PRODUCT_WORDS, 8)),
+            "tags": random.sample(PRODUCT_WORDS, 3),
+            "category": random.choice(CATEGORIES),
+            "suitable_for": random.sample(["dog", "cat"], random.randint(1, 2)),
+            "price": random.randint(99, 9999)
+        })
+    data_dir.mkdir(parents=True, exist_ok=True)
+    with open(data_dir / "products.json", "w", encoding="utf-8") as f:
+        json.dump(products, f)
+
+def _wait_for(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+@contextmanager
+def _servers(args, workdir: Path):
+    """Start the stubs and an API worker; yields (base_url, worker_pid)"""
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    openai_port, places_port, api_port = _free_port(), _free_port(), _free_port()
+    processes = []
+    try:
+        processes.append(subprocess.Popen([
+            sys.executable, "-m", "tools.stub_openai", "--port", str(openai_port),
+            "--latency", str(args.openai_latency), "--error-rate", str(args.openai_error_rate)
+        ], cwd=ROOT, env=env))
+        processes.append(subprocess.Popen([
+            sys.executable, "-m", "tools.stub_places", "--port", str(places_port),
+            "--latency", str(args.places_latency)
+        ], cwd=ROOT, env=env))
+        worker_env = {
+            **env,
+            "OPENAI_API_KEY": "stub",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+            "GOOGLE_MAPS_API_KEY": "stub",
+            "GOOGLE_PLACES_BASE_URL": f"http://127.0.0.1:{places_port}/maps/api/place",
+            # Every virtual user connects from 127.0.0.1, so one client bucket would
+            # throttle the whole run; admission and backlog limits still apply
+            "CLIENT_UPLOADS_PER_MINUTE": str(args.client_uploads_per_minute),
+            "CLIENT_UPLOAD_BURST": str(args.client_uploads_per_minute)
+        }
+        worker = subprocess.Popen([
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(api_port), "--log-level", "warning"
+        ], cwd=workdir, env=worker_env)
+        processes.append(worker)
+
+        _wait_for(f"http://127.0.0.1:{openai_port}/stats")
+        _wait_for(f"http://127.0.0.1:{places_port}/stats")
+        _wait_for(f"http://127.0.0.1:{api_port}/health")
+        yield f"http://127.0.0.1:{api_port}", worker.pid
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+async def _run(args, base_url: str, worker_pid: Optional[int]) -> Dict:
+    weights = {}
+    for item in args.mix.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight or 1)
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        test = LoadTest(client, recorder, _make_video() if weights.get("video") else None)
+        await test.seed_pets(args.pets)
+        recorder.latencies.clear()
+        recorder.errors.clear()
+
+        scenarios = [getattr(test, f"scenario_{name}") for name in weights]
+        rss_samples = []
+        deadline = test.deadline = time.monotonic() + args.duration
+
+        async def user():
+            while time.monotonic() < deadline:
+                scenario = random.choices(scenarios, weights=list(weights.values()))[0]
+                await scenario()
+
+        async def sample_rss():
+            while time.monotonic() < deadline:
+                rss = _rss_mb(worker_pid) if worker_pid else None
+                if rss is not None:
+                    rss_samples.append(rss)
+                await asyncio.sleep(1.0)
+
+        started = time.monotonic()
+        await asyncio.gather(sample_rss(), *(user() for _ in range(args.concurrency)))
+        report = recorder.report(time.monotonic() - started)
+
+    report["config"] = {
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "mix": weights,
+        "pets": args.pets,
+        "products": args.products
+    }
+    if rss_samples:
+        report["worker_rss_mb"] = {
+            "start": round(rss_samples[0], 1),
+            "peak": round(max(rss_samples), 1),
+            "end": round(rss_samples[-1], 1)
+        }
+    return report
+
+def _print_report(report: Dict):
+    print(f"{report['requests']} requests in {report['elapsed_s']}s "
+          f"({report['throughput_rps']} req/s), {report['errors']} errors")
+    if "worker_rss_mb" in report:
+        rss = report["worker_rss_mb"]
+        print(f"Worker RSS: start {rss['start']} MB, peak {rss['peak']} MB, end {rss['end']} MB")
+    print(f"{'route':<40} {'reqs':>7} {'err%':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for route, stats in report["routes"].items():
+        print(f"{route:<40} {stats['requests']:>7} {stats['error_rate'] * 100:>5.1f}% {stats['rps']:>7} "
+              f"{stats['p50_ms']:>7.1f}ms {stats['p95_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms")
+    for route, sample in report["error_samples"].items():
+        print(f"  first error on {route}: {sample}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the PetCare API with local upstream stubs")
+    parser.add_argument("--base-url", help="Test an already running server instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test duration in seconds")
+    parser.add_argument("--mix", default="crud=2,browse=5,video=1,vets=2", help="Scenario weights")
+    parser.add_argument("--pets", type=int, default=50, help="Pets created before the run")
+    parser.add_argument("--products", type=int, default=500, help="Products seeded before the run")
+    parser.add_argument("--openai-latency", type=float, default=1.0)
+    parser.add_argument("--openai-error-rate", type=float, default=0.05)
+    parser.add_argument("--places-latency", type=float, default=0.2)
+    parser.add_argument("--client-uploads-per-minute", type=float, default=1000000,
+                        help="Per-client upload rate limit of the started worker (all users share one address)")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    if args.base_url:
+        report = asyncio.run(_run(args, args.base_url, None))
+    else:
+        with tempfile.TemporaryDirectory(prefix="petcare-loadtest-") as tmp:
+            workdir = Path(tmp)
+            _seed_products(workdir / "data", args.products)
+            with _servers(args, workdir) as (base_url, worker_pid):
+                report = asyncio.run(_run(args, base_url, worker_pid))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+if __name__ == "__main__":
+    main()
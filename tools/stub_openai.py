@@ -0,0 +1,110 @@
+"""
+Local OpenAI-compatible stub server for offline load testing of video analysis.
+
+Usage:
+    python -m tools.stub_openai --port 8100 --latency 1.5 --error-rate 0.1
+
+Then point the API at it:
+    OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8100/v1 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+_ANALYSIS = {
+    "insights": [{"type": "positive", "text": "Normal activity levels detected"}],
+    "behaviors": ["walking", "playing"],
+    "concerns": [],
+    "recommendations": ["Continue regular exercise routine"],
+    "confidence": 0.8
+}
+
+def create_app(
+    latency: float = 1.0,
+    jitter: float = 0.5,
+    error_rate: float = 0.0,
+    rate_limit_rate: float = 0.0
+) -> FastAPI:
+    """
+    Build the stub app.
+    error_rate is the fraction of calls answered with a 500, rate_limit_rate the
+    fraction answered with a 429 carrying Retry-After.
+    """
+    app = FastAPI(title="OpenAI stub")
+    app.state.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.stats["requests"] += 1
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+
+        roll = random.random()
+        if roll < rate_limit_rate:
+            app.state.stats["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": "1"},
+                content={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+            )
+        if roll < rate_limit_rate + error_rate:
+            app.state.stats["errors"] += 1
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "Stub server error", "type": "server_error", "code": None}}
+            )
+
+        images = sum(
+            1
+            for message in body.get("messages", [])
+            if isinstance(message.get("content"), list)
+            for part in message["content"]
+            if part.get("type") == "image_url"
+        )
+        prompt_tokens = 100 + images * 765
+        completion_tokens = 120
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(_ANALYSIS)},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.stats
+
+    return app
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=1.0, help="Mean response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Uniform latency jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of 429 responses")
+    args = parser.parse_args()
+
+    app = create_app(args.latency, args.jitter, args.error_rate, args.rate_limit_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
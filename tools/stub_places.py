@@ -0,0 +1,122 @@
+"""
+Local stand-in for the Google Places API (nearby search and details).
+
+Clinics are generated deterministically on a 0.01 degree grid, so repeated
+queries return consistent results.
+
+Usage:
+    python -m tools.stub_places --port 8200 --latency 0.2
+
+Then point the API at it:
+    GOOGLE_MAPS_API_KEY=stub GOOGLE_PLACES_BASE_URL=http://127.0.0.1:8200/maps/api/place uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import math
+import random
+from fastapi import FastAPI
+from app.services.geo_cache import haversine
+
+GRID = 0.01
+MAX_RESULTS = 20
+# Nearby searches with this key fail the way an invalid key does
+DENIED_KEY = "denied"
+
+def _cell_clinics(cell_lat: int, cell_lng: int) -> list:
+    rng = random.Random(cell_lat * 1000003 + cell_lng)
+    clinics = []
+    for i in range(rng.randint(0, 2)):
+        lat = (cell_lat + rng.random()) * GRID
+        lng = (cell_lng + rng.random()) * GRID
+        clinics.append({
+            "place_id": f"stub_{cell_lat}_{cell_lng}_{i}",
+            "name": f"Stub Veterinary Clinic {cell_lat}/{cell_lng}/{i}",
+            "vicinity": f"{rng.randint(1, 999)} Stub Street",
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "geometry": {"location": {"lat": lat, "lng": lng}},
+            "opening_hours": {"open_now": rng.random() < 0.7}
+        })
+    return clinics
+
+def _clinic(place_id: str):
+    try:
+        _, cell_lat, cell_lng, index = place_id.split("_")
+        return _cell_clinics(int(cell_lat), int(cell_lng))[int(index)]
+    except (ValueError, IndexError):
+        return None
+
+def create_app(latency: float = 0.2) -> FastAPI:
+    app = FastAPI(title="Places stub")
+    app.state.stats = {"nearby": 0, "details": 0}
+
+    @app.get("/maps/api/place/nearbysearch/json")
+    async def nearby_search(location: str, radius: float = 5000, type: str = "", key: str = ""):
+        app.state.stats["nearby"] += 1
+        await asyncio.sleep(latency)
+        if key == DENIED_KEY:
+            # Places reports key and quota errors in a 200 body
+            return {"results": [], "status": "REQUEST_DENIED", "error_message": "The provided API key is invalid."}
+        lat, lng = (float(v) for v in location.split(","))
+        radius = min(radius, 50000)
+        dlat = radius / 111320 / GRID
+        dlng = radius / (111320 * max(math.cos(math.radians(lat)), 0.01)) / GRID
+
+        found = []
+        for cell_lat in range(math.floor(lat / GRID - dlat), math.ceil(lat / GRID + dlat) + 1):
+            for cell_lng in range(math.floor(lng / GRID - dlng), math.ceil(lng / GRID + dlng) + 1):
+                for clinic in _cell_clinics(cell_lat, cell_lng):
+                    position = clinic["geometry"]["location"]
+                    distance = haversine(lat, lng, position["lat"], position["lng"])
+                    if distance <= radius:
+                        found.append((distance, clinic))
+        found.sort(key=lambda item: item[0])
+        response = {"results": [clinic for _, clinic in found[:MAX_RESULTS]], "status": "OK"}
+        if len(found) > MAX_RESULTS:
+            response["next_page_token"] = "stub"
+        return response
+
+    @app.get("/maps/api/place/details/json")
+    async def details(place_id: str, fields: str = "", key: str = ""):
+        app.state.stats["details"] += 1
+        await asyncio.sleep(latency)
+        clinic = _clinic(place_id)
+        if clinic is None:
+            return {"status": "NOT_FOUND"}
+        result = {
+            "place_id": place_id,
+            "name": clinic["name"],
+            "formatted_address": clinic["vicinity"] + ", Stub City",
+            "formatted_phone_number": "(555) 010-0000",
+            "rating": clinic["rating"],
+            "website": f"https://example.com/{place_id}",
+            "geometry": clinic["geometry"],
+            "opening_hours": {
+                "open_now": clinic["opening_hours"]["open_now"],
+                "weekday_text": ["Monday: 9:00 AM - 6:00 PM"]
+            },
+            "photos": []
+        }
+        if fields:
+            wanted = set(fields.split(","))
+            result = {k: v for k, v in result.items() if k in wanted or k == "place_id"}
+        return {"result": result, "status": "OK"}
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.stats
+
+    return app
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Google Places stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--latency", type=float, default=0.2, help="Response latency in seconds")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.latency), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()